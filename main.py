@@ -1,10 +1,20 @@
 ## Copyright (c) 2025 Radium-bit
 ## SPDX-License-Identifier: GPL-V3
 ## See LICENSE file for full terms
-import tkinter as tk
-from modules.ui_components import MainWindow
+import os
+import sys
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # 带参数时进入命令行批量模式，不导入tkinter/PIL
+        import multiprocessing
+        from modules.cli import main
+        multiprocessing.freeze_support()  # 打包后的EXE中启动并行工作进程
+        sys.exit(main())
+
+    import tkinter as tk
+    from modules.ui_components import MainWindow
     root = tk.Tk()
-    app = MainWindow(root)
+    # 设置 VCG_TRADE_TABLE=canvas 时交易列表使用Canvas表格（各物品列均显示图标）
+    app = MainWindow(root, canvas_trade_table=os.environ.get("VCG_TRADE_TABLE") == "canvas")
     root.mainloop()
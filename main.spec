@@ -1,17 +1,66 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
+import sys
+
+sys.path.insert(0, SPECPATH)
+from modules.icon_atlas import build_icon_atlas, ATLAS_IMAGE_NAME, ATLAS_INDEX_NAME
+from modules.resource_archive import build_resource_archive, RESOURCE_ARCHIVE_NAME
+from modules.item_catalog import compile_item_catalog, catalog_name
+
+# 打包模式：默认单文件EXE；设置环境变量 VCG_ONEDIR=1 时输出目录版（启动时无需解包到临时目录）
+ONEDIR = os.environ.get('VCG_ONEDIR') == '1'
+
+# 打包前将所有图标拼合为一张图集，运行时只需读取和解码一个文件
+res_dir = os.path.join(SPECPATH, 'modules', 'res')
+atlas_dir = os.path.join(workpath, 'icon_atlas')
+build_icon_atlas(os.path.join(res_dir, 'minecraft_icons'), atlas_dir)
+
+# 物品JSON编译为二进制物品目录，启动时直接映射，无需解析JSON
+res_files = {
+    'README.txt': os.path.join(res_dir, 'README.txt'),
+    ATLAS_IMAGE_NAME: os.path.join(atlas_dir, ATLAS_IMAGE_NAME),
+    ATLAS_INDEX_NAME: os.path.join(atlas_dir, ATLAS_INDEX_NAME),
+}
+for items_json in ('Items_ZH.json', 'Items_EN_Unproofread.json'):
+    res_files[items_json] = os.path.join(res_dir, items_json)
+    catalog_path = os.path.join(workpath, catalog_name(items_json))
+    with open(res_files[items_json], 'rb') as f:
+        compiled = compile_item_catalog(f.read())
+    with open(catalog_path, 'wb') as f:
+        f.write(compiled)
+    res_files[catalog_name(items_json)] = catalog_path
+
+# 所有资源合并为一个不压缩的zip，运行时通过内存映射按需读取
+res_archive = os.path.join(workpath, RESOURCE_ARCHIVE_NAME)
+build_resource_archive(res_archive, res_files)
 
 
 a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[('modules/res', 'modules/res')],
+    datas=[
+        (res_archive, 'modules'),
+    ],
     hiddenimports=[
         'modules.ui_components',
         'modules.nbt_handler',
         'modules.trade_manager',
         'modules.command_generator',
         'modules.config_handler',
+        'modules.icon_provider',
+        'modules.icon_atlas',
+        'modules.item_search',
+        'modules.virtual_list',
+        'modules.trade_table',
+        'modules.snbt',
+        'modules.trade',
+        'modules.config_io',
+        'modules.datapack_exporter',
+        'modules.batch_generator',
+        'modules.cli',
+        'modules.resource_archive',
+        'modules.item_catalog',
     ],
     hookspath=[],
     hooksconfig={},
@@ -24,9 +73,9 @@ pyz = PYZ(a.pure)
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
+    *([] if ONEDIR else [a.binaries, a.datas]),
     [],
+    exclude_binaries=ONEDIR,
     name='VillagerCommandGenerator',
     debug=False,
     bootloader_ignore_signals=False,
@@ -41,3 +90,14 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
+
+if ONEDIR:
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.datas,
+        strip=False,
+        upx=True,
+        upx_exclude=[],
+        name='VillagerCommandGenerator',
+    )
@@ -0,0 +1,164 @@
+## Copyright (c) 2025 Radium-bit
+## SPDX-License-Identifier: GPL-V3
+## See LICENSE file for full terms
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from modules.nbt_handler import NbtHandler
+from modules.command_generator import CommandGenerator
+from modules.config_io import read_config
+from modules.datapack_exporter import DatapackExporter, DEFAULT_NAMESPACE
+
+# 工作进程内的BatchGenerator（每个进程创建一次，NBT缓存在同一进程的任务间复用）
+_worker_generator = None
+
+
+def _init_worker():
+    global _worker_generator
+    _worker_generator = BatchGenerator()
+
+
+def _run_in_worker(method_name, args):
+    return _worker_generator.run_task(method_name, args)
+
+
+class BatchGenerator:
+    """
+    批量处理村民配置JSON（ConfigHandler保存的格式），生成指令文本或数据包
+    不依赖tkinter/PIL，可在无图形界面的环境（如构建流水线）中使用
+    workers大于1时把配置分片到多个进程并行处理，输出顺序与单进程时完全一致
+    """
+
+    def __init__(self, command_generator=None, nbt_handler=None, workers=1):
+        self.command_generator = command_generator or CommandGenerator()
+        self.nbt_handler = nbt_handler or NbtHandler()
+        self.workers = workers
+        self.errors = []  # [(配置路径, 错误信息)]，单个配置出错不影响其他配置
+        self.stats = {"villagers": 0, "recipes": 0, "seconds": 0.0}  # 最近一次批处理的统计
+
+    @staticmethod
+    def collect_config_paths(patterns):
+        """把目录（取其中的*.json）、通配符和文件路径展开为去重后的配置文件列表"""
+        paths = []
+        for pattern in patterns:
+            if os.path.isdir(pattern):
+                matches = sorted(glob.glob(os.path.join(pattern, "*.json")))
+            else:
+                matches = sorted(glob.glob(pattern)) or [pattern]
+            paths.extend(matches)
+        return list(dict.fromkeys(paths))
+
+    def throughput(self):
+        """返回最近一次批处理的 (村民/秒, 交易项/秒)"""
+        seconds = max(self.stats["seconds"], 1e-9)
+        return self.stats["villagers"] / seconds, self.stats["recipes"] / seconds
+
+    def run_task(self, method_name, args):
+        """
+        执行单个配置的任务，返回 (结果, 错误信息)，出错时结果为None
+        任何异常都只记为该配置失败，不中断整批处理
+        """
+        try:
+            return getattr(self, method_name)(*args), None
+        except (OSError, ValueError) as e:
+            return None, str(e)
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}"
+
+    def _run(self, method_name, tasks):
+        """
+        按顺序产出每个任务的 (结果, 错误信息)
+        多进程时按分片提交，map保证结果顺序与任务顺序一致
+        """
+        if self.workers <= 1 or len(tasks) <= 1:
+            for args in tasks:
+                yield self.run_task(method_name, args)
+            return
+        chunksize = max(len(tasks) // (self.workers * 4), 1)
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as executor:
+            yield from executor.map(
+                _run_in_worker, [method_name] * len(tasks), tasks, chunksize=chunksize
+            )
+
+    def _collect(self, config_paths, results):
+        """汇总结果和错误，按顺序产出成功的结果；提前关闭时一并关闭results（结束进程池）"""
+        try:
+            for path, (result, error) in zip(config_paths, results):
+                if error is not None:
+                    self.errors.append((path, error))
+                    continue
+                self.stats["villagers"] += 1
+                self.stats["recipes"] += result[-1]
+                yield result
+        finally:
+            results.close()
+
+    def generate_commands(self, config_paths, output_dir, chunk_bytes=None):
+        """
+        为每个配置在output_dir写入同名的.txt指令文件（每行一条指令，可直接用于命令方块或脚本）
+        chunk_bytes不为空时交易列表指令按该长度分段
+        返回成功生成的文件数
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.stats = {"villagers": 0, "recipes": 0, "seconds": 0.0}
+        start = time.perf_counter()
+        tasks = [(path, output_dir, chunk_bytes) for path in config_paths]
+        count = sum(1 for _ in self._collect(config_paths, self._run("_commands_task", tasks)))
+        self.stats["seconds"] = time.perf_counter() - start
+        return count
+
+    def _commands_task(self, path, output_dir, chunk_bytes):
+        """生成单个配置的指令文件，返回 (交易项数,)"""
+        config = read_config(path)
+        output_path = os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0] + ".txt")
+        with open(output_path, "w", encoding="utf-8") as f:
+            self._write_commands(f, config["villager_name"], config["profession"], config["trades"], chunk_bytes)
+        return (len(config["trades"]),)
+
+    def _write_commands(self, file, villager_name, profession, trades, chunk_bytes):
+        for command in self.command_generator.generate_setup_commands(villager_name, profession):
+            file.write(command + "\n")
+        if chunk_bytes:
+            for command in self.command_generator.iter_chunked_trade_commands(
+                    villager_name, trades, self.nbt_handler, chunk_bytes):
+                file.write(command + "\n")
+        else:
+            self.command_generator.write_trade_command(
+                file, villager_name, trades, self.nbt_handler, separator=","
+            )
+            file.write("\n")
+
+    def export_datapack(self, config_paths, output_dir, namespace=DEFAULT_NAMESPACE):
+        """
+        把所有配置导出为一个数据包，返回 (总函数ID, 村民数)
+        各村民的函数文件可并行写入临时路径，文件命名和总函数按配置顺序在主进程完成
+        """
+        self.stats = {"villagers": 0, "recipes": 0, "seconds": 0.0}
+        start = time.perf_counter()
+        exporter = DatapackExporter(self.command_generator, self.nbt_handler, namespace=namespace)
+        function_dir = exporter.prepare(output_dir)
+        tasks = [
+            (path, exporter.staging_path(function_dir, index), namespace)
+            for index, path in enumerate(config_paths, 1)
+        ]
+        results = self._collect(config_paths, self._run("_datapack_task", tasks))
+
+        def staged():
+            # finish关闭本生成器时一并关闭results，清理临时文件前所有工作进程都已结束
+            try:
+                for villager_name, staging_path, _ in results:
+                    yield villager_name, staging_path
+            finally:
+                results.close()
+
+        function_id = exporter.finish(function_dir, staged())
+        self.stats["seconds"] = time.perf_counter() - start
+        return function_id, self.stats["villagers"]
+
+    def _datapack_task(self, path, staging_path, namespace):
+        """把单个配置的村民函数写入临时路径，返回 (村民名称, 临时路径, 交易项数)"""
+        config = read_config(path)
+        exporter = DatapackExporter(self.command_generator, self.nbt_handler, namespace=namespace)
+        exporter.write_villager_file(staging_path, config["villager_name"], config["profession"], config["trades"])
+        return config["villager_name"], staging_path, len(config["trades"])
@@ -0,0 +1,79 @@
+## Copyright (c) 2025 Radium-bit
+## SPDX-License-Identifier: GPL-V3
+## See LICENSE file for full terms
+import argparse
+import os
+import sys
+from modules.batch_generator import BatchGenerator
+from modules.command_generator import DEFAULT_COMMAND_BUDGET
+from modules.datapack_exporter import DEFAULT_NAMESPACE
+
+
+def _int_at_least(minimum):
+    """argparse的type：解析不小于minimum的整数，否则报用法错误"""
+    def parse(text):
+        try:
+            value = int(text)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"需要整数：{text!r}")
+        if value < minimum:
+            raise argparse.ArgumentTypeError(f"不能小于 {minimum}：{value}")
+        return value
+    return parse
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="无界面批量生成村民交易指令（不启动图形界面）"
+    )
+    parser.add_argument(
+        "-j", "--workers", type=_int_at_least(0), default=1,
+        help="并行处理的进程数（0为CPU核心数，默认1）"
+    )
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+
+    commands = subparsers.add_parser("commands", help="为每个配置生成一个指令文本文件（每行一条指令）")
+    commands.add_argument("configs", nargs="+", help="配置JSON文件、目录或通配符")
+    commands.add_argument("-o", "--output", required=True, help="输出目录")
+    commands.add_argument(
+        "--chunk-bytes", type=_int_at_least(1), nargs="?", const=DEFAULT_COMMAND_BUDGET, default=None,
+        help=f"按长度分段交易列表指令（默认 {DEFAULT_COMMAND_BUDGET} 字节）"
+    )
+
+    datapack = subparsers.add_parser("datapack", help="把所有配置导出为一个数据包")
+    datapack.add_argument("configs", nargs="+", help="配置JSON文件、目录或通配符")
+    datapack.add_argument("-o", "--output", required=True, help="数据包目录")
+    datapack.add_argument("--namespace", default=DEFAULT_NAMESPACE, help="数据包命名空间")
+    return parser
+
+
+def main(argv=None):
+    """命令行入口，返回进程退出码（有配置处理失败时为1）"""
+    args = build_parser().parse_args(argv)
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    generator = BatchGenerator(workers=workers)
+    config_paths = generator.collect_config_paths(args.configs)
+    if not config_paths:
+        print("未找到配置文件", file=sys.stderr)
+        return 1
+
+    if args.mode == "commands":
+        count = generator.generate_commands(config_paths, args.output, args.chunk_bytes)
+        print(f"已生成 {count} 个指令文件到 {args.output}")
+    else:
+        function_id, count = generator.export_datapack(config_paths, args.output, args.namespace)
+        print(f"已导出 {count} 个村民到数据包 {args.output}，游戏内执行 /function {function_id}")
+    villagers_per_sec, recipes_per_sec = generator.throughput()
+    print(
+        f"耗时 {generator.stats['seconds']:.2f} 秒（{workers} 个进程），"
+        f"{villagers_per_sec:.1f} 村民/秒，{recipes_per_sec:.0f} 交易项/秒"
+    )
+
+    for path, error in generator.errors:
+        print(f"处理失败 {path}: {error}", file=sys.stderr)
+    return 1 if generator.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,26 @@
 ## Copyright (c) 2025 Radium-bit
 ## SPDX-License-Identifier: GPL-V3
 ## See LICENSE file for full terms
+# 命令方块可输入的最大指令长度（按UTF-8字节计，留有余量）
+DEFAULT_COMMAND_BUDGET = 32500
+# 分段追加交易项时使用的临时storage
+CHUNK_STORAGE = "villager_generator:chunk"
+# 交易项之间的默认分隔符（换行缩进便于阅读；.mcfunction等要求单行时传入","）
+RECIPE_SEPARATOR = ",\n    "
+
+
 class CommandGenerator:
     """生成Minecraft指令的核心类"""
     
     def generate_all_commands(self, villager_name, profession, trades, nbt_handler):
         """生成所有步骤的指令"""
+        # 设置Offers.Recipes（交易列表）
+        cmd_step4 = self.generate_trade_command(villager_name, trades, nbt_handler)
+        
+        return self.generate_setup_commands(villager_name, profession) + [cmd_step4]
+    
+    def generate_setup_commands(self, villager_name, profession):
+        """生成交易列表之前的设置指令（名称、职业、驻留、名称可见）"""
         custom_name_nbt = f'{{"text":"{villager_name}"}}'
         
         # 设置CustomName
@@ -29,36 +44,86 @@ class CommandGenerator:
             f'/data modify entity @e[type=villager,name="{villager_name}",limit=1] CustomNameVisible set value 1b'
         )
         
-        # 设置Offers.Recipes（交易列表）
-        cmd_step4 = self.generate_trade_command(villager_name, trades, nbt_handler)
-        
-        return [cmd_step0, cmd_step1, cmd_step2, cmd_step3, cmd_step4]
+        return [cmd_step0, cmd_step1, cmd_step2, cmd_step3]
     
     def generate_trade_command(self, villager_name, trades, nbt_handler):
         """生成交易列表指令（支持buy2物品）"""
-        recipes = []
+        return "".join(self.iter_trade_command(villager_name, trades, nbt_handler))
+    
+    def iter_trade_command(self, villager_name, trades, nbt_handler, separator=RECIPE_SEPARATOR):
+        """
+        逐段生成交易列表指令：依次产出指令前缀、每个交易项（含分隔符）和结尾，
+        拼接后与generate_trade_command的结果相同，内存占用与交易项数量无关
+        """
+        yield (
+            f'/data modify entity @e[type=villager,name="{villager_name}",limit=1] Offers.Recipes set value ['
+        )
+        leading = ""
         for trade in trades:
-            try:
-                # 构建buy和sell的NBT
-                buy_nbt = nbt_handler.build_item_nbt_string(trade["buy_id"], trade["buy_count"])
-                sell_nbt = nbt_handler.build_item_nbt_string(trade["sell_id"], trade["sell_count"])
-                
-                # 构建buy2的NBT（处理可选的第二个购买物品）
-                buy2_id = trade.get("buy2_id", "minecraft:air")
-                buy2_count = trade.get("buy2_count", "1")
-                buy2_nbt = nbt_handler.build_item_nbt_string(buy2_id, buy2_count)
-                
-                # 构建交易项（包含buy2字段，仅当非默认空气时添加）
-                trade_parts = [f'buy:{buy_nbt}', f'sell:{sell_nbt}', f'maxUses:{trade["max_uses"]}']
-                if buy2_id != "minecraft:air" or buy2_count != "1":
-                    trade_parts.insert(1, f'buyB:{buy2_nbt}')  # Minecraft使用buyB表示第二个购买物品
-                
-                recipes.append(f'{{{", ".join(trade_parts)}}}')
-            except Exception as e:
-                raise ValueError(f"生成交易项失败 {trade['buy_id']} (+{trade.get('buy2_id', '空气')}) → {trade['sell_id']}: {str(e)}")
+            yield leading + self.format_recipe(trade, nbt_handler)
+            leading = separator
+        yield "]"
+    
+    def format_recipe(self, trade, nbt_handler):
+        """生成单个交易项的NBT（支持buy2物品）"""
+        # 交易项创建时已完成校验和物品解析，这里只做字符串拼接
+        buy_nbt = nbt_handler.format_item_nbt(*trade.buy_item, trade.buy_count)
+        sell_nbt = nbt_handler.format_item_nbt(*trade.sell_item, trade.sell_count)
         
-        recipes_str = ",\n    ".join(recipes)
-        return (
-            f'/data modify entity @e[type=villager,name="{villager_name}",limit=1] Offers.Recipes set value '
-            f'[{recipes_str}]'
-        )
+        # 构建交易项（包含buy2字段，仅当非默认空气时添加）
+        trade_parts = [f'buy:{buy_nbt}', f'sell:{sell_nbt}', f'maxUses:{trade.max_uses}']
+        if trade.has_buy2:
+            buy2_nbt = nbt_handler.format_item_nbt(*trade.buy2_item, trade.buy2_count)
+            trade_parts.insert(1, f'buyB:{buy2_nbt}')  # Minecraft使用buyB表示第二个购买物品
+        
+        return f'{{{", ".join(trade_parts)}}}'
+    
+    def iter_chunked_trade_commands(self, villager_name, trades, nbt_handler, max_bytes=DEFAULT_COMMAND_BUDGET):
+        """
+        分段生成交易列表指令，每条指令的UTF-8长度不超过max_bytes：
+        第一段用 set value 写入村民，之后每段先写入临时storage，再用 append from 追加到村民，
+        最后清理临时storage，逐条产出指令字符串
+        交易项顺序决定村民界面中的顺序，不能重排，因此按顺序贪心装箱（对保序分段而言段数最少）
+        单个交易项超出上限时抛出ValueError
+        """
+        entity_path = f'entity @e[type=villager,name="{villager_name}",limit=1] Offers.Recipes'
+        first_prefix = f'/data modify {entity_path} set value ['
+        chunk_prefix = f'/data modify storage {CHUNK_STORAGE} recipes set value ['
+        append_command = f'/data modify {entity_path} append from storage {CHUNK_STORAGE} recipes[]'
+        
+        prefix = first_prefix
+        chunk = []
+        size = len(prefix.encode("utf-8")) + 1  # 前缀 + 结尾的"]"
+        for trade in trades:
+            recipe = self.format_recipe(trade, nbt_handler)
+            recipe_size = len(recipe.encode("utf-8"))
+            added = recipe_size + (1 if chunk else 0)  # 与前一项之间的","
+            if chunk and size + added > max_bytes:
+                yield prefix + ",".join(chunk) + "]"
+                if prefix is chunk_prefix:
+                    yield append_command
+                prefix = chunk_prefix
+                chunk = []
+                size = len(prefix.encode("utf-8")) + 1
+                added = recipe_size
+            if size + added > max_bytes:
+                raise ValueError(f"单个交易项长度 {recipe_size} 字节，超出每条指令 {max_bytes} 字节的上限：{trade!r}")
+            chunk.append(recipe)
+            size += added
+        
+        yield prefix + ",".join(chunk) + "]"
+        if prefix is chunk_prefix:
+            yield append_command
+            # 清理临时storage
+            yield f'/data remove storage {CHUNK_STORAGE} recipes'
+    
+    def write_trade_command(self, file, villager_name, trades, nbt_handler, chunk_size=256,
+                            separator=RECIPE_SEPARATOR):
+        """把交易列表指令分块写入文本文件对象，每chunk_size段写入一次"""
+        chunk = []
+        for fragment in self.iter_trade_command(villager_name, trades, nbt_handler, separator):
+            chunk.append(fragment)
+            if len(chunk) >= chunk_size:
+                file.write("".join(chunk))
+                chunk.clear()
+        file.write("".join(chunk))
@@ -1,9 +1,9 @@
 ## Copyright (c) 2025 Radium-bit
 ## SPDX-License-Identifier: GPL-V3
 ## See LICENSE file for full terms
-import json
 import os
-from tkinter import filedialog, messagebox
+from modules.config_io import read_config, write_config
+from modules.datapack_exporter import DatapackExporter
 
 class ConfigHandler:
     """处理配置的保存和加载"""
@@ -13,12 +13,8 @@ class ConfigHandler:
     
     def save_config_to_json(self):
         """保存当前配置到JSON文件"""
-        config_data = {
-            "villager_name": self.main_window.villager_name.get().strip() or "CustomName",
-            "profession": self.main_window.profession_var.get(),
-            "trades": self.main_window.trade_manager.trades
-        }
-        
+        # tkinter对话框在使用时才导入，读写配置本身只依赖config_io
+        from tkinter import filedialog, messagebox
         file_path = filedialog.asksaveasfilename(
             defaultextension=".json",
             filetypes=[("JSON Files", "*.json"), ("All Files", "*.*")],
@@ -28,8 +24,12 @@ class ConfigHandler:
             return
         
         try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(config_data, f, indent=4, ensure_ascii=False)
+            write_config(
+                file_path,
+                self.main_window.villager_name.get().strip() or "CustomName",
+                self.main_window.profession_var.get(),
+                self.main_window.trade_manager.trades
+            )
             messagebox.showinfo("成功", f"配置已保存到：\n{os.path.basename(file_path)}")
         except Exception as e:
             messagebox.showerror("保存失败", f"错误信息：{str(e)}")
@@ -37,6 +37,7 @@ class ConfigHandler:
     def load_config_from_json(self):
         import tkinter as tk
         """从JSON文件加载配置"""
+        from tkinter import filedialog, messagebox
         file_path = filedialog.askopenfilename(
             filetypes=[("JSON Files", "*.json"), ("All Files", "*.*")],
             title="选择要加载的JSON配置文件"
@@ -45,19 +46,9 @@ class ConfigHandler:
             return
         
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                config_data = json.load(f)
-            
-            # 验证关键字段
-            required_fields = ["villager_name", "profession", "trades"]
-            if not all(field in config_data for field in required_fields):
-                raise ValueError("JSON文件缺少关键字段（villager_name/profession/trades）")
-            
-            # 验证交易项结构
-            for trade in config_data["trades"]:
-                trade_required = ["buy_id", "buy_count", "sell_id", "sell_count", "max_uses", "trade_type"]
-                if not all(field in trade for field in trade_required):
-                    raise ValueError(f"交易项结构错误：{trade}")
+            # 读取并验证配置，交易项转换为Trade对象
+            config_data = read_config(file_path)
+            trades = config_data["trades"]
             
             # 应用配置
             self.main_window.villager_name.delete(0, tk.END)
@@ -70,11 +61,43 @@ class ConfigHandler:
                 messagebox.showwarning("职业不匹配", f"配置中的职业{config_data['profession']}不存在，使用默认盔甲匠")
                 self.main_window.profession_var.set("armorer")
             
-            # 加载交易项
+            # 加载交易项（载入的配置作为新的初始状态，清空撤销历史）
             self.main_window.cancel_edit()
-            self.main_window.trade_manager.trades = config_data["trades"]
-            self.main_window.update_trade_listbox()
+            self.main_window.trade_manager.load_trades(trades)
             
             messagebox.showinfo("成功", f"已加载配置：\n{os.path.basename(file_path)}")
         except Exception as e:
             messagebox.showerror("加载失败", f"错误信息：{str(e)}")
+    
+    def export_datapack(self):
+        """把当前村民和选中的JSON配置一起导出为数据包"""
+        from tkinter import filedialog, messagebox
+        file_paths = filedialog.askopenfilenames(
+            filetypes=[("JSON Files", "*.json"), ("All Files", "*.*")],
+            title="选择要一起导出的村民配置（可多选，取消则只导出当前村民）"
+        )
+        output_dir = filedialog.askdirectory(title="选择数据包的保存位置（将在其中创建数据包文件夹）")
+        if not output_dir:
+            return
+        
+        main_window = self.main_window
+        villagers = [(
+            main_window.villager_name.get().strip() or "CustomName",
+            main_window.profession_var.get(),
+            main_window.trade_manager.trades
+        )]
+        try:
+            for file_path in file_paths:
+                config_data = read_config(file_path)
+                villagers.append((config_data["villager_name"], config_data["profession"], config_data["trades"]))
+            
+            exporter = DatapackExporter(main_window.command_generator, main_window.nbt_handler)
+            pack_dir = os.path.join(output_dir, "villager_trades")
+            function_id = exporter.export(pack_dir, villagers)
+            messagebox.showinfo(
+                "成功",
+                f"已导出{len(villagers)}个村民到数据包：\n{pack_dir}\n\n"
+                f"放入存档的datapacks文件夹并执行 /reload 后，执行 /function {function_id} 即可部署"
+            )
+        except Exception as e:
+            messagebox.showerror("导出失败", f"错误信息：{str(e)}")
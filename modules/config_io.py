@@ -0,0 +1,43 @@
+## Copyright (c) 2025 Radium-bit
+## SPDX-License-Identifier: GPL-V3
+## See LICENSE file for full terms
+import json
+from modules.trade import Trade
+
+# 配置文件必须包含的字段
+REQUIRED_FIELDS = ("villager_name", "profession", "trades")
+
+
+def read_config(file_path):
+    """
+    读取村民配置JSON，返回 {"villager_name", "profession", "trades": [Trade]}
+    文件结构或交易项错误时抛出ValueError（不依赖图形界面）
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        config_data = json.load(f)
+    
+    # 验证关键字段
+    if not isinstance(config_data, dict) or not all(field in config_data for field in REQUIRED_FIELDS):
+        raise ValueError("JSON文件缺少关键字段（villager_name/profession/trades）")
+    if not isinstance(config_data["villager_name"], str) or not isinstance(config_data["profession"], str):
+        raise ValueError("villager_name和profession必须是字符串")
+    if not isinstance(config_data["trades"], list):
+        raise ValueError("trades必须是交易项列表")
+    
+    return {
+        "villager_name": config_data["villager_name"],
+        "profession": config_data["profession"],
+        # 验证交易项结构并转换为Trade对象
+        "trades": [Trade.from_dict(trade) for trade in config_data["trades"]]
+    }
+
+
+def write_config(file_path, villager_name, profession, trades):
+    """把村民配置写入JSON文件（交易项为Trade对象）"""
+    config_data = {
+        "villager_name": villager_name,
+        "profession": profession,
+        "trades": [trade.to_dict() for trade in trades]
+    }
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(config_data, f, indent=4, ensure_ascii=False)
@@ -0,0 +1,135 @@
+## Copyright (c) 2025 Radium-bit
+## SPDX-License-Identifier: GPL-V3
+## See LICENSE file for full terms
+import glob
+import json
+import os
+import re
+
+# 生成的指令使用 Count:1b 物品格式（1.20.4及以前），对应数据包格式15（1.20/1.20.1）
+PACK_FORMAT = 15
+DEFAULT_NAMESPACE = "villager_generator"
+MASTER_FUNCTION = "deploy_all"
+VILLAGER_DIR = "villagers"
+
+_INVALID_NAME_RE = re.compile(r"[^a-z0-9_.-]+")
+
+
+class DatapackExporter:
+    """
+    把多个村民的指令导出为数据包：pack.mcmeta + 每个村民一个.mcfunction + 一个总函数，
+    游戏内执行 /function <命名空间>:deploy_all 即可一次部署所有村民
+    逐个村民边生成边写入文件，内存占用与村民和交易项总数无关
+    """
+
+    def __init__(self, command_generator, nbt_handler, namespace=DEFAULT_NAMESPACE,
+                 pack_format=PACK_FORMAT, description="Villager trades generated by MinecraftVillageCustomer"):
+        self.command_generator = command_generator
+        self.nbt_handler = nbt_handler
+        self.namespace = namespace
+        self.pack_format = pack_format
+        self.description = description
+
+    def export(self, output_dir, villagers):
+        """
+        写入数据包到output_dir（数据包根目录，不存在时自动创建）
+        villagers: 可迭代的 (村民名称, 职业, 交易项列表)
+        返回总函数的ID（如 villager_generator:deploy_all）
+        """
+        function_dir = self.prepare(output_dir)
+
+        def staged():
+            for index, (villager_name, profession, trades) in enumerate(villagers, 1):
+                path = self.staging_path(function_dir, index)
+                self.write_villager_file(path, villager_name, profession, trades)
+                yield villager_name, path
+
+        return self.finish(function_dir, staged())
+
+    def prepare(self, output_dir):
+        """
+        创建数据包目录结构并写入pack.mcmeta，返回函数目录
+        删除之前导出留下的村民函数，导出后villagers目录与总函数中的村民一一对应
+        """
+        function_dir = os.path.join(output_dir, "data", self.namespace, "functions")
+        villager_dir = os.path.join(function_dir, VILLAGER_DIR)
+        os.makedirs(villager_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(villager_dir, "*.mcfunction")):
+            os.remove(path)
+
+        with open(os.path.join(output_dir, "pack.mcmeta"), "w", encoding="utf-8") as f:
+            json.dump({"pack": {"pack_format": self.pack_format, "description": self.description}},
+                      f, indent=4, ensure_ascii=False)
+        return function_dir
+
+    @staticmethod
+    def staging_path(function_dir, index):
+        """第index个村民的函数在确定最终文件名之前的临时路径（可由多个进程并行写入）"""
+        return os.path.join(function_dir, VILLAGER_DIR, f".staging_{index}.tmp")
+
+    def write_villager_file(self, path, villager_name, profession, trades):
+        """把单个村民的函数写入path，村民名称或职业不是字符串时抛出ValueError"""
+        if not isinstance(villager_name, str) or not isinstance(profession, str):
+            raise ValueError(f"村民名称和职业必须是字符串：{villager_name!r}, {profession!r}")
+        with open(path, "w", encoding="utf-8") as f:
+            self._write_villager_function(f, villager_name, profession, trades)
+
+    def finish(self, function_dir, staged):
+        """
+        按顺序为已写好的村民函数确定文件名，全部完成后再写入总函数
+        staged: 按村民顺序可迭代的 (村民名称, 临时路径)
+        无论成功与否都会关闭staged并删除剩余的临时文件（出错的村民或中途失败时留下的）
+        返回总函数的ID
+        """
+        used_names = set()
+        names = []
+        try:
+            for index, (villager_name, path) in enumerate(staged, 1):
+                name = self._function_name(villager_name, index, used_names)
+                os.replace(path, os.path.join(function_dir, VILLAGER_DIR, f"{name}.mcfunction"))
+                names.append(name)
+
+            with open(os.path.join(function_dir, f"{MASTER_FUNCTION}.mcfunction"), "w", encoding="utf-8") as master:
+                master.write("# 部署所有村民的交易（每个村民需已存在并带有对应的自定义名称）\n")
+                for name in names:
+                    master.write(f"function {self.namespace}:{VILLAGER_DIR}/{name}\n")
+        finally:
+            # 先关闭staged（并行导出时等待工作进程结束），再清理临时文件
+            close = getattr(staged, "close", None)
+            if close is not None:
+                close()
+            for path in glob.glob(self.staging_path(function_dir, "*")):
+                os.remove(path)
+
+        return f"{self.namespace}:{MASTER_FUNCTION}"
+
+    def _write_villager_function(self, file, villager_name, profession, trades):
+        """写入单个村民的函数：设置指令 + 交易列表指令（.mcfunction每行一条，不带/）"""
+        file.write(f"# 村民：{villager_name}\n")
+        for command in self.command_generator.generate_setup_commands(villager_name, profession):
+            file.write(command.lstrip("/") + "\n")
+
+        # 交易列表指令可能很长，直接流式写入；交易项之间不能换行
+        fragments = self.command_generator.iter_trade_command(
+            villager_name, trades, self.nbt_handler, separator=","
+        )
+        file.write(next(fragments).lstrip("/"))
+        for fragment in fragments:
+            file.write(fragment)
+        file.write("\n")
+
+    @staticmethod
+    def _function_name(villager_name, index, used_names):
+        """把村民名称转换为合法且不重复的函数名（仅允许小写字母、数字、_ . -）"""
+        if not isinstance(villager_name, str):
+            raise ValueError(f"村民名称必须是字符串：{villager_name!r}")
+        name = _INVALID_NAME_RE.sub("_", villager_name.lower()).strip("_")
+        if not name:
+            name = f"villager_{index}"
+        candidate = name
+        suffix = 2
+        while candidate in used_names:
+            candidate = f"{name}_{suffix}"
+            suffix += 1
+        used_names.add(candidate)
+        return candidate
@@ -0,0 +1,112 @@
+## Copyright (c) 2025 Radium-bit
+## SPDX-License-Identifier: GPL-V3
+## See LICENSE file for full terms
+import io
+import json
+import math
+import os
+import sys
+
+ICON_PREFIX = "ItemSprite_"
+ATLAS_IMAGE_NAME = "icon_atlas.png"
+ATLAS_INDEX_NAME = "icon_atlas.json"
+
+
+def build_icon_atlas(icon_dir, output_dir, icon_size=(32, 32), columns=32):
+    """
+    将icon_dir下所有ItemSprite_*.png缩放后拼合为一张图集，并生成ID→偏移索引
+    输出: output_dir/icon_atlas.png 与 output_dir/icon_atlas.json
+    返回: 打包的图标数量
+    """
+    # Pillow仅在打包或切图时导入，读取索引不依赖Pillow
+    from PIL import Image
+    names = sorted(
+        name for name in os.listdir(icon_dir)
+        if name.startswith(ICON_PREFIX) and name.endswith(".png")
+    )
+    width, height = icon_size
+    rows = max(math.ceil(len(names) / columns), 1)
+    atlas = Image.new("RGBA", (columns * width, rows * height), (0, 0, 0, 0))
+
+    offsets = {}
+    for i, name in enumerate(names):
+        item_id = name[len(ICON_PREFIX):-len(".png")]
+        try:
+            # 与运行时逐个加载的缩放方式保持一致
+            img = Image.open(os.path.join(icon_dir, name)).resize(icon_size, Image.Resampling.LANCZOS)
+        except Exception as e:
+            print(f"打包图标 {item_id} 失败: {e}")
+            continue
+        x, y = (i % columns) * width, (i // columns) * height
+        atlas.paste(img.convert("RGBA"), (x, y))
+        offsets[item_id] = [x, y]
+
+    os.makedirs(output_dir, exist_ok=True)
+    atlas.save(os.path.join(output_dir, ATLAS_IMAGE_NAME), optimize=True)
+    with open(os.path.join(output_dir, ATLAS_INDEX_NAME), "w", encoding="utf-8") as f:
+        json.dump({"icon_size": [width, height], "icons": offsets}, f, separators=(",", ":"))
+    return len(offsets)
+
+
+class IconAtlas:
+    """从预构建的图集中切出单个图标，整张图集只读取和解码一次"""
+
+    def __init__(self, index, open_image):
+        # open_image() 返回图集图片的路径或文件对象，首次切图时才调用
+        self.open_image = open_image
+        self.icon_size = tuple(index["icon_size"])
+        self.offsets = index["icons"]  # {item_id: [x, y]}
+        self._sheet = None  # 解码后的整张图集，首次取图标时加载
+
+    @classmethod
+    def load(cls, directory):
+        """从目录加载图集，图集文件不存在时返回None"""
+        image_path = os.path.join(directory, ATLAS_IMAGE_NAME)
+        index_path = os.path.join(directory, ATLAS_INDEX_NAME)
+        if not (os.path.exists(image_path) and os.path.exists(index_path)):
+            return None
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            return cls(index, lambda: image_path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"加载图标图集失败: {e}")
+            return None
+
+    @classmethod
+    def load_archive(cls, archive):
+        """从资源包（ResourceArchive）加载图集，图集不存在时返回None"""
+        if ATLAS_IMAGE_NAME not in archive or ATLAS_INDEX_NAME not in archive:
+            return None
+        try:
+            index = json.loads(archive.read(ATLAS_INDEX_NAME).decode("utf-8"))
+            return cls(index, lambda: io.BytesIO(archive.view(ATLAS_IMAGE_NAME)))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"加载图标图集失败: {e}")
+            return None
+
+    def __contains__(self, item_id):
+        return item_id in self.offsets
+
+    def crop(self, item_id):
+        """返回物品图标的PIL图像，图集中不存在时返回None"""
+        offset = self.offsets.get(item_id)
+        if offset is None:
+            return None
+        if self._sheet is None:
+            from PIL import Image
+            sheet = Image.open(self.open_image())
+            sheet.load()
+            self._sheet = sheet
+        x, y = offset
+        width, height = self.icon_size
+        return self._sheet.crop((x, y, x + width, y + height))
+
+
+if __name__ == "__main__":
+    # 用法: python -m modules.icon_atlas [图标目录] [输出目录]
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    src_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(base_dir, "res", "minecraft_icons")
+    out_dir = sys.argv[2] if len(sys.argv) > 2 else os.path.join(base_dir, "res")
+    count = build_icon_atlas(src_dir, out_dir)
+    print(f"已打包 {count} 个图标到 {out_dir}")
@@ -0,0 +1,213 @@
+## Copyright (c) 2025 Radium-bit
+## SPDX-License-Identifier: GPL-V3
+## See LICENSE file for full terms
+import hashlib
+import io
+import os
+import queue
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+APP_NAME = "VillagerCommandGenerator"
+
+
+def user_cache_dir(app_name=APP_NAME):
+    """返回当前用户的缓存目录（按平台约定）"""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+    elif sys.platform == "darwin":
+        base = os.path.join(os.path.expanduser("~"), "Library", "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, app_name)
+
+
+class IconDiskCache:
+    """缩放后图标的磁盘缓存，按源文件内容哈希和目标尺寸存储RGBA原始字节"""
+
+    def __init__(self, cache_dir, icon_size=(32, 32)):
+        self.cache_dir = cache_dir
+        self.icon_size = icon_size
+
+    def key_for(self, source_bytes):
+        """根据源PNG内容和目标尺寸计算缓存键，源文件变化时自动失效"""
+        hash_obj = hashlib.sha1(source_bytes)
+        hash_obj.update(f"{self.icon_size[0]}x{self.icon_size[1]}".encode("ascii"))
+        return hash_obj.hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.rgba")
+
+    def load(self, key):
+        """读取缓存的图标，未命中或数据损坏时返回None"""
+        from PIL import Image
+        try:
+            with open(self._entry_path(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        width, height = self.icon_size
+        if len(data) != width * height * 4:
+            return None
+        return Image.frombytes("RGBA", self.icon_size, data)
+
+    def store(self, key, img):
+        """写入缓存（先写临时文件再替换，避免并发读到半个文件）"""
+        entry_path = self._entry_path(key)
+        tmp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(img.convert("RGBA").tobytes())
+            os.replace(tmp_path, entry_path)
+        except OSError as e:
+            print(f"写入图标缓存失败: {e}")
+
+
+class IconProvider:
+    """
+    按需加载物品图标，并用LRU缓存限制常驻内存的图标数量
+    request()在后台线程池中完成PIL解码，主线程通过root.after分批转换为PhotoImage
+    """
+
+    def __init__(self, root, icon_dir, icon_size=(32, 32), max_cached=256, atlas=None, disk_cache=None,
+                 max_workers=4, batch_size=16, poll_interval=15):
+        self.root = root
+        self.icon_dir = icon_dir
+        self.atlas = atlas  # 可选的预构建图集（IconAtlas），存在时优先从图集切图
+        self.disk_cache = disk_cache  # 可选的磁盘缓存（IconDiskCache），跳过重复缩放
+        self.icon_size = icon_size
+        self.max_cached = max_cached
+        self._cache = OrderedDict()  # {item_id: PhotoImage对象}，按最近使用排序
+        self._missing = set()        # 无图标文件或解码失败的物品ID，避免重复访问磁盘
+        # 后台解码相关状态（_pending仅在主线程访问）
+        self.batch_size = batch_size        # 每轮主线程最多转换的图标数
+        self.poll_interval = poll_interval  # 主线程轮询解码结果的间隔（毫秒）
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="icon-decode")
+        self._results = queue.Queue()  # 工作线程产出的 (item_id, PIL图像或None)
+        self._pending = {}             # {item_id: [回调函数]}，正在解码的图标
+        self._futures = set()          # 已提交但尚未完成的解码任务，关闭时取消
+        self._pump_id = None
+        self._atlas_lock = threading.Lock()
+        self.default_icon = self._load_default_icon()
+
+    def _icon_path(self, item_id):
+        return os.path.join(self.icon_dir, f"ItemSprite_{item_id}.png")
+
+    def _decode(self, item_id):
+        """解码物品图标为PIL图像，无对应图标时返回None"""
+        # Pillow在首次解码图标时才导入，导入本模块不依赖Pillow
+        from PIL import Image
+        if self.atlas is not None and item_id in self.atlas:
+            with self._atlas_lock:  # 图集首次切图时会解码整张图，避免多个线程重复加载
+                img = self.atlas.crop(item_id)
+            if img.size != self.icon_size:
+                img = img.resize(self.icon_size, Image.Resampling.LANCZOS)
+            return img
+        icon_path = self._icon_path(item_id)
+        if not os.path.exists(icon_path):
+            return None
+        with open(icon_path, "rb") as f:
+            source_bytes = f.read()
+
+        key = None
+        if self.disk_cache is not None:
+            key = self.disk_cache.key_for(source_bytes)
+            img = self.disk_cache.load(key)
+            if img is not None:
+                return img
+
+        img = Image.open(io.BytesIO(source_bytes)).resize(self.icon_size, Image.Resampling.LANCZOS)
+        if key is not None:
+            self.disk_cache.store(key, img)
+        return img
+
+    def _load_default_icon(self):
+        """加载默认图标（不存在时使用透明图标）"""
+        from PIL import Image, ImageTk
+        try:
+            img = self._decode("default")
+            if img is not None:
+                return ImageTk.PhotoImage(img)
+        except Exception as e:
+            print(f"加载默认图标失败: {e}")
+        return ImageTk.PhotoImage(Image.new("RGBA", self.icon_size, (0, 0, 0, 0)))
+
+    def _remember(self, item_id, photo):
+        self._cache[item_id] = photo
+        # 超出上限时淘汰最久未使用的图标
+        while len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+
+    def request(self, item_id, callback):
+        """
+        异步获取物品图标（需在主线程调用）
+        已缓存时直接返回对应图标；否则返回默认图标作为占位，
+        后台解码完成后在主线程调用 callback(photo)
+        """
+        if not item_id or item_id in self._missing:
+            return self.default_icon
+
+        photo = self._cache.get(item_id)
+        if photo is not None:
+            self._cache.move_to_end(item_id)
+            return photo
+
+        callbacks = self._pending.get(item_id)
+        if callbacks is None:
+            self._pending[item_id] = [callback]
+            future = self._executor.submit(self._decode_job, item_id)
+            self._futures.add(future)
+            future.add_done_callback(self._futures.discard)
+            self._schedule_pump()
+        elif callback not in callbacks:
+            callbacks.append(callback)
+        return self.default_icon
+
+    def _decode_job(self, item_id):
+        """工作线程：只做PIL解码和缩放，不触碰Tk对象"""
+        try:
+            img = self._decode(item_id)
+        except Exception as e:
+            print(f"加载图标 {item_id} 失败: {e}")
+            img = None
+        self._results.put((item_id, img))
+
+    def _schedule_pump(self):
+        if self._pump_id is None:
+            self._pump_id = self.root.after(self.poll_interval, self._pump)
+
+    def _pump(self):
+        """主线程：分批把解码结果转换为PhotoImage并通知调用方"""
+        from PIL import ImageTk
+        self._pump_id = None
+        for _ in range(self.batch_size):
+            try:
+                item_id, img = self._results.get_nowait()
+            except queue.Empty:
+                break
+            callbacks = self._pending.pop(item_id, [])
+            if img is None:
+                self._missing.add(item_id)
+                continue
+            photo = ImageTk.PhotoImage(img)
+            self._remember(item_id, photo)
+            for callback in callbacks:
+                try:
+                    callback(photo)
+                except Exception as e:
+                    print(f"更新图标 {item_id} 失败: {e}")
+        if self._pending:
+            self._schedule_pump()
+
+    def shutdown(self):
+        """停止后台解码线程，丢弃尚未开始的任务（主窗口关闭时调用）"""
+        if self._pump_id is not None:
+            self.root.after_cancel(self._pump_id)
+            self._pump_id = None
+        # 逐个取消尚未开始的任务（Executor.shutdown的cancel_futures参数需要Python 3.9）
+        for future in list(self._futures):
+            future.cancel()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,179 @@
+## Copyright (c) 2025 Radium-bit
+## SPDX-License-Identifier: GPL-V3
+## See LICENSE file for full terms
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from collections.abc import Sequence
+
+CATALOG_SUFFIX = ".cat"
+CATALOG_MAGIC = b"VCIC"
+CATALOG_VERSION = 1
+
+# 文件头：魔数、版本、物品数、源JSON的CRC32和字节数（用于判断编译结果是否过期）
+_HEADER = struct.Struct("<4sHxxIII")
+# 定长记录：ID和名称在字符串表中的偏移与长度（UTF-8字节）
+_RECORD = struct.Struct("<IIII")
+
+
+def catalog_name(json_name):
+    """物品JSON对应的编译目录文件名，如 Items_ZH.json → Items_ZH.cat"""
+    return os.path.splitext(json_name)[0] + CATALOG_SUFFIX
+
+
+def source_fingerprint(json_bytes):
+    """源JSON的指纹 (CRC32, 字节数)，与zip条目记录的CRC和大小一致"""
+    return zlib.crc32(json_bytes), len(json_bytes)
+
+
+def parse_items_json(json_bytes):
+    """解析物品JSON，只保留同时有ID和名称的物品"""
+    raw_data = json.loads(json_bytes.decode("utf-8"))
+    return [item for item in raw_data if item.get("ID") and item.get("Name")]
+
+
+def compile_item_catalog(json_bytes):
+    """把物品JSON编译为紧凑的二进制目录：文件头 + 定长记录 + 字符串表"""
+    items = parse_items_json(json_bytes)
+    records = []
+    strings = bytearray()
+    for item in items:
+        fields = []
+        for text in (item["ID"], item["Name"]):
+            encoded = text.encode("utf-8")
+            fields += (len(strings), len(encoded))
+            strings += encoded
+        records.append(_RECORD.pack(*fields))
+    crc, size = source_fingerprint(json_bytes)
+    header = _HEADER.pack(CATALOG_MAGIC, CATALOG_VERSION, len(items), crc, size)
+    return header + b"".join(records) + bytes(strings)
+
+
+class ItemCatalog(Sequence):
+    """
+    只读物品目录，直接在编译结果（bytes或内存映射）上按下标取物品，
+    打开耗时与物品数量无关；取出的物品为 {"ID": ..., "Name": ...}，与JSON加载结果一致
+    """
+
+    def __init__(self, buffer):
+        self._buffer = buffer if isinstance(buffer, memoryview) else memoryview(buffer)
+        magic, version, count, crc, size = _HEADER.unpack_from(self._buffer, 0)
+        if magic != CATALOG_MAGIC or version != CATALOG_VERSION:
+            raise ValueError("物品目录格式不匹配")
+        self._count = count
+        self._strings = _HEADER.size + count * _RECORD.size
+        if len(self._buffer) < self._strings:
+            raise ValueError("物品目录文件不完整")
+        self.fingerprint = (crc, size)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("物品下标超出范围")
+        id_offset, id_length, name_offset, name_length = _RECORD.unpack_from(
+            self._buffer, _HEADER.size + index * _RECORD.size
+        )
+        base = self._strings
+        return {
+            "ID": str(self._buffer[base + id_offset:base + id_offset + id_length], "utf-8"),
+            "Name": str(self._buffer[base + name_offset:base + name_offset + name_length], "utf-8"),
+        }
+
+
+def _open_catalog(buffer, fingerprint):
+    """打开编译目录，格式错误或与源JSON指纹不一致（已过期）时返回None"""
+    view = memoryview(buffer)
+    try:
+        catalog = ItemCatalog(view)
+        if catalog.fingerprint == fingerprint:
+            return catalog
+    except (ValueError, struct.error):
+        pass
+    # 释放对内存映射的引用，之后才能关闭映射并覆盖缓存文件（Windows下映射中的文件不能替换）
+    view.release()
+    return None
+
+
+def _map_file(path):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _write_cache(path, data):
+    """写入编译缓存（先写临时文件再替换），失败时忽略"""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"写入物品目录缓存失败: {e}")
+
+
+def load_item_catalog(json_name, resources=None, res_dir=None, cache_dir=None):
+    """
+    加载物品表，依次尝试：资源包中的编译目录 → 缓存目录中的编译目录 → 解析JSON
+    编译目录的指纹与当前JSON不一致时视为过期；解析JSON后会重新编译到cache_dir
+    JSON不存在时抛出FileNotFoundError，格式错误时抛出json.JSONDecodeError
+    """
+    name = catalog_name(json_name)
+    json_bytes = None
+    if resources is not None and json_name in resources:
+        # 资源包中的条目已记录CRC和大小，无需读取JSON即可判断是否过期
+        fingerprint = resources.fingerprint(json_name)
+        if name in resources:
+            catalog = _open_catalog(resources.view(name), fingerprint)
+            if catalog is not None:
+                return catalog
+    else:
+        with open(os.path.join(res_dir, json_name), "rb") as f:
+            json_bytes = f.read()
+        fingerprint = source_fingerprint(json_bytes)
+
+    cache_path = os.path.join(cache_dir, name) if cache_dir else None
+    if cache_path:
+        try:
+            mapped = _map_file(cache_path)
+        except OSError:
+            mapped = None
+        if mapped is not None:
+            catalog = _open_catalog(mapped, fingerprint)
+            if catalog is not None:
+                return catalog
+            mapped.close()
+
+    # 编译目录缺失或过期：解析JSON并重新编译
+    if json_bytes is None:
+        json_bytes = resources.read(json_name)
+    compiled = compile_item_catalog(json_bytes)
+    if cache_path:
+        _write_cache(cache_path, compiled)
+    return ItemCatalog(compiled)
+
+
+if __name__ == "__main__":
+    # 用法: python -m modules.item_catalog 物品JSON... 输出目录
+    if len(sys.argv) < 3:
+        print("用法: python -m modules.item_catalog 物品JSON... 输出目录")
+        sys.exit(1)
+    out_dir = sys.argv[-1]
+    os.makedirs(out_dir, exist_ok=True)
+    for json_path in sys.argv[1:-1]:
+        with open(json_path, "rb") as f:
+            compiled = compile_item_catalog(f.read())
+        out_path = os.path.join(out_dir, catalog_name(os.path.basename(json_path)))
+        with open(out_path, "wb") as f:
+            f.write(compiled)
+        print(f"已编译 {len(ItemCatalog(compiled))} 个物品到 {out_path}")
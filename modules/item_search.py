@@ -0,0 +1,209 @@
+## Copyright (c) 2025 Radium-bit
+## SPDX-License-Identifier: GPL-V3
+## See LICENSE file for full terms
+import heapq
+from collections import Counter
+
+# 可选依赖pypinyin：安装后支持按拼音全拼/首字母搜索中文名称
+# 导入较慢，首次遇到非ASCII名称时才导入，None为尚未导入，False为未安装
+_pypinyin = None
+
+# 排名：完全匹配ID > 前缀匹配 > 子串匹配 > 模糊匹配
+RANK_EXACT = 0
+RANK_PREFIX = 1
+RANK_SUBSTRING = 2
+RANK_FUZZY = 3
+
+# 启用模糊匹配的最短查询长度（过短的查询容错会匹配到大量无关物品）
+FUZZY_MIN_LENGTH = 4
+# 直接匹配结果少于该数量时才追加模糊匹配结果
+FUZZY_TRIGGER = 20
+# 每次查询最多校验编辑距离的候选数，保证单次按键的耗时上限
+FUZZY_MAX_CANDIDATES = 100
+
+
+def _load_pypinyin():
+    """返回pypinyin模块，未安装时返回None"""
+    global _pypinyin
+    if _pypinyin is None:
+        try:
+            import pypinyin
+            _pypinyin = pypinyin
+        except ImportError:
+            _pypinyin = False
+    return _pypinyin or None
+
+
+def max_typos(query):
+    """按查询长度决定允许的编辑距离"""
+    if len(query) < FUZZY_MIN_LENGTH:
+        return 0
+    return 1 if len(query) < 8 else 2
+
+
+def bounded_substring_distance(query, text, limit):
+    """
+    计算query与text中任意子串的最小编辑距离，超过limit时返回None
+    相邻两字符互换（如 diamnod → diamond）按一次编辑计算（受限Damerau距离，即OSA距离）
+    使用Myers/Hyyrö位并行算法：query的每个字符对应整数的一位，text每个字符只需几次整数运算，
+    代替逐格计算的动态规划
+    """
+    if len(text) < len(query) - limit:
+        # 子串最多比query短limit个字符，text更短时距离必然超过limit
+        return None
+    mask = (1 << len(query)) - 1
+    high = 1 << (len(query) - 1)
+    peq = {}  # {字符: query中该字符所在位置的位掩码}
+    for i, qc in enumerate(query):
+        peq[qc] = peq.get(qc, 0) | (1 << i)
+
+    pv, mv = mask, 0  # 当前列相邻两行之差为+1/-1的位置
+    d0 = 0            # 上一列中与左上角格相等（对角线差为0）的位置
+    prev_eq = 0
+    score = best = len(query)
+    for tc in text:
+        eq = peq.get(tc, 0)
+        # 互换：query[i-1:i+1]与text的前后两个字符交叉相等，且上一列对角线未能直接匹配
+        tr = (((~d0 & eq) << 1) & prev_eq) & mask
+        d0 = (((eq & pv) + pv) ^ pv) | eq | mv | tr
+        ph = mv | (~(d0 | pv) & mask)
+        mh = pv & d0
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+            if score < best:
+                best = score
+        # 匹配可从text任意位置开始（第0行全为0），移位时不补1
+        ph = (ph << 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(d0 | ph) & mask)
+        mv = ph & d0
+        prev_eq = eq
+    return best if best <= limit else None
+
+
+class ItemSearchIndex:
+    """物品选择器的搜索索引，构建一次后每次查询只需查倒排表"""
+
+    def __init__(self, items):
+        self.items = items
+        self._ids = []    # 预处理的小写ID
+        self._keys = []   # 每个物品参与匹配的小写字符串 (ID, 名称, 拼音全拼, 拼音首字母)
+        self._unigrams = {}  # {字符: {物品下标}}
+        self._bigrams = {}   # {二元组: {物品下标}}
+        for idx, item in enumerate(items):
+            item_id = item["ID"].lower()
+            keys = (item_id, item["Name"].lower()) + self._pinyin_keys(item["Name"])
+            self._ids.append(item_id)
+            self._keys.append(keys)
+            for key in keys:
+                for ch in key:
+                    self._unigrams.setdefault(ch, set()).add(idx)
+                for i in range(len(key) - 1):
+                    self._bigrams.setdefault(key[i:i + 2], set()).add(idx)
+
+    @staticmethod
+    def _pinyin_keys(name):
+        """预计算名称的拼音全拼和首字母（ASCII名称或未安装pypinyin时为空）"""
+        if name.isascii():
+            return ()
+        pypinyin = _load_pypinyin()
+        if pypinyin is None:
+            return ()
+        full = "".join(pypinyin.lazy_pinyin(name)).lower()
+        initials = "".join(pypinyin.lazy_pinyin(name, style=pypinyin.Style.FIRST_LETTER)).lower()
+        if full == name.lower():
+            return ()
+        return (full, initials)
+
+    @staticmethod
+    def normalize(text):
+        """统一查询格式：去空白、转小写、去掉minecraft:命名空间"""
+        text = text.strip().lower()
+        if text.startswith("minecraft:"):
+            text = text[len("minecraft:"):]
+        return text
+
+    @staticmethod
+    def _grams(query):
+        return {query[i:i + 2] for i in range(len(query) - 1)}
+
+    def _candidates(self, query):
+        """通过倒排表缩小候选集（结果仍需校验子串）"""
+        if len(query) == 1:
+            return self._unigrams.get(query, set())
+        postings = []
+        for gram in self._grams(query):
+            posting = self._bigrams.get(gram)
+            if not posting:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        return postings[0].intersection(*postings[1:])
+
+    def _rank(self, idx, query):
+        """返回匹配等级，不匹配时返回None"""
+        if self._ids[idx] == query:
+            return RANK_EXACT
+        rank = None
+        for key in self._keys[idx]:
+            if key.startswith(query):
+                return RANK_PREFIX
+            if rank is None and query in key:
+                rank = RANK_SUBSTRING
+        return rank
+
+    def _fuzzy_matches(self, query, exclude):
+        """
+        容错匹配：每处编辑最多破坏三个二元组（相邻互换时），先按共享二元组数量筛出候选，
+        再对候选计算有上限的编辑距离，返回 [(距离, 物品下标)]
+        """
+        limit = max_typos(query)
+        if limit == 0:
+            return []
+        grams = self._grams(query)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._bigrams.get(gram, ()))
+        min_shared = max(len(grams) - 3 * limit, 1)
+        candidates = heapq.nlargest(
+            FUZZY_MAX_CANDIDATES,
+            (idx for idx, count in shared.items() if count >= min_shared and idx not in exclude),
+            key=shared.__getitem__
+        )
+
+        matches = []
+        for idx in candidates:
+            best = None
+            for key in self._keys[idx]:
+                distance = bounded_substring_distance(query, key, limit if best is None else best - 1)
+                if distance is not None:
+                    best = distance
+                    if best == 0:
+                        break
+            if best is not None:
+                matches.append((best, idx))
+        return matches
+
+    def search(self, text):
+        """返回按相关度排序的物品列表（同等级保持原有顺序）"""
+        return [self.items[idx] for idx in self.search_indices(text)]
+
+    def search_indices(self, text):
+        """与search相同，但返回物品在items中的下标"""
+        query = self.normalize(text)
+        if not query:
+            return list(range(len(self.items)))
+        ranked = []
+        matched = set()
+        for idx in self._candidates(query):
+            rank = self._rank(idx, query)
+            if rank is not None:
+                ranked.append((rank, 0, idx))
+                matched.add(idx)
+        if len(matched) < FUZZY_TRIGGER:
+            for distance, idx in self._fuzzy_matches(query, matched):
+                ranked.append((RANK_FUZZY, distance, idx))
+        ranked.sort()
+        return [idx for _, _, idx in ranked]
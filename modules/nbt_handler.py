@@ -3,10 +3,36 @@
 ## See LICENSE file for full terms
 import re
 import hashlib
+from functools import lru_cache
+from modules.snbt import SnbtError, parse_compound
+
+# 物品ID部分：可选命名空间 + 物品名
+ITEM_ID_PATTERN = re.compile(r'([a-zA-Z0-9_]+:)?[a-zA-Z0-9_]+')
+ITEM_FORMAT_HINT = "正确格式示例: minecraft:bow 或 tacz:gun{Tag:value}"
 
 class NbtHandler:
     """处理NBT标签的解析、构建和哈希计算"""
     
+    def __init__(self, cache_size=4096):
+        # 同一物品字符串会被列表渲染、悬停预览和指令生成反复处理，
+        # 按输入做有上限的缓存（解析失败抛出的异常不会被缓存）
+        self.cache_size = cache_size
+        self._caches = {
+            "parse": lru_cache(maxsize=cache_size)(self._parse_item_with_nbt),
+            "build": lru_cache(maxsize=cache_size)(self._build_item_nbt_string),
+            "hash": lru_cache(maxsize=cache_size)(self._get_nbt_hash),
+            "simplify": lru_cache(maxsize=cache_size)(self._simplify_item_id),
+        }
+    
+    def cache_info(self):
+        """返回各缓存的命中/未命中统计：{名称: CacheInfo(hits, misses, maxsize, currsize)}"""
+        return {name: cached.cache_info() for name, cached in self._caches.items()}
+    
+    def cache_clear(self):
+        """清空所有缓存及统计"""
+        for cached in self._caches.values():
+            cached.cache_clear()
+    
     def parse_item_with_nbt(self, item_input):
         """
         解析包含NBT标签的物品输入
@@ -16,23 +42,35 @@ class NbtHandler:
         
         返回: (item_id, nbt_tags) 元组，nbt_tags为解析后的标签字符串或None
         """
+        item_id, _, nbt_tags = self._caches["parse"](item_input)
+        return (item_id, nbt_tags)
+    
+    def parse_item_tree(self, item_input):
+        """
+        与parse_item_with_nbt相同，但返回NBT的语法树
+        返回: (item_id, nbt_tree) 元组，nbt_tree为SnbtNode（compound）或None
+        """
+        item_id, nbt_tree, _ = self._caches["parse"](item_input)
+        return (item_id, nbt_tree)
+    
+    def _parse_item_with_nbt(self, item_input):
         item_input = item_input.strip()
         
-        # 正则表达式匹配物品ID和NBT标签
-        pattern = r'^([a-zA-Z0-9_]+:)?[a-zA-Z0-9_]+(?:\{.*\})?$'
-        if not re.match(pattern, item_input):
-            raise ValueError(f"无效的物品格式: {item_input}\n正确格式示例: minecraft:bow 或 tacz:gun{Tag:value}")
+        # 匹配物品ID，其后若有内容则必须是一个完整的NBT compound
+        match = ITEM_ID_PATTERN.match(item_input)
+        if not match or (match.end() < len(item_input) and item_input[match.end()] != '{'):
+            raise ValueError(f"无效的物品格式: {item_input}\n{ITEM_FORMAT_HINT}")
+        item_id_part = match.group()
         
-        # 分离物品ID和NBT标签
-        nbt_start = item_input.find('{')
-        nbt_end = item_input.rfind('}')
-        
-        if nbt_start != -1 and nbt_end != -1 and nbt_start < nbt_end:
-            item_id_part = item_input[:nbt_start]
-            nbt_tags = item_input[nbt_start:nbt_end+1]
-        else:
-            item_id_part = item_input
-            nbt_tags = None
+        # 单遍解析NBT标签，语法错误时给出出错位置
+        nbt_tree = None
+        nbt_tags = None
+        if match.end() < len(item_input):
+            try:
+                nbt_tree = parse_compound(item_input, match.end())
+            except SnbtError as e:
+                raise ValueError(f"无效的NBT标签: {item_input}\n{e}\n{ITEM_FORMAT_HINT}") from e
+            nbt_tags = item_input[nbt_tree.start:nbt_tree.end]
         
         # 处理物品ID（仅当不含命名空间时添加minecraft:）
         if ':' not in item_id_part:
@@ -40,28 +78,36 @@ class NbtHandler:
         else:
             item_id = item_id_part
         
-        return (item_id, nbt_tags)
+        return (item_id, nbt_tree, nbt_tags)
 
     def build_item_nbt_string(self, item_input, count):
         """构建完整的物品NBT字符串"""
+        return self._caches["build"](item_input, count)
+    
+    def _build_item_nbt_string(self, item_input, count):
         try:
             item_id, nbt_tags = self.parse_item_with_nbt(item_input)
-            
-            # 基础NBT结构
-            parts = [f'id:"{item_id}"', f'Count:{count}b']
-            
-            # 如果有标签，添加tag部分
-            if nbt_tags:
-                # 移除标签外的大括号
-                inner_tags = nbt_tags[1:-1] if nbt_tags.startswith('{') and nbt_tags.endswith('}') else nbt_tags
-                parts.insert(1, f'tag:{{{inner_tags}}}')
-            
-            return '{' + ', '.join(parts) + '}'
+            return self.format_item_nbt(item_id, nbt_tags, count)
         except Exception as e:
             raise ValueError(f"构建物品NBT失败: {str(e)}")
+    
+    @staticmethod
+    def format_item_nbt(item_id, nbt_tags, count):
+        """由已解析的物品ID和NBT标签构建物品NBT字符串"""
+        # 基础NBT结构
+        parts = [f'id:"{item_id}"', f'Count:{count}b']
+        
+        # 如果有标签，添加tag部分（解析时已校验，直接复用原文，无需重新序列化）
+        if nbt_tags:
+            parts.insert(1, f'tag:{nbt_tags}')
+        
+        return '{' + ', '.join(parts) + '}'
 
     def get_nbt_hash(self, nbt_tags):
         """计算NBT标签的短哈希值（前7个字符）"""
+        return self._caches["hash"](nbt_tags)
+    
+    def _get_nbt_hash(self, nbt_tags):
         if not nbt_tags:
             return None
         
@@ -72,5 +118,8 @@ class NbtHandler:
 
     def simplify_item_id(self, item_id):
         """简化物品ID显示（移除命名空间和标签）"""
+        return self._caches["simplify"](item_id)
+    
+    def _simplify_item_id(self, item_id):
         simplified = re.sub(r'{.*$', '', item_id)
         return simplified.replace("minecraft:", "")
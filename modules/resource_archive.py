@@ -0,0 +1,77 @@
+## Copyright (c) 2025 Radium-bit
+## SPDX-License-Identifier: GPL-V3
+## See LICENSE file for full terms
+import mmap
+import os
+import struct
+import zipfile
+
+RESOURCE_ARCHIVE_NAME = "res.zip"
+
+# zip本地文件头：固定30字节，文件名长度和扩展字段长度位于偏移26处
+_LOCAL_HEADER = struct.Struct("<4s22xHH")
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+
+def build_resource_archive(output_path, files):
+    """
+    把资源文件打包为不压缩（ZIP_STORED）的zip，运行时可直接从内存映射中切片读取
+    files: {包内名称: 源文件路径}
+    """
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, path in sorted(files.items()):
+            archive.write(path, name)
+    return len(files)
+
+
+class ResourceArchive:
+    """
+    只读资源包：用mmap映射整个zip文件，按需读取单个资源，不解压到临时目录
+    未压缩的条目通过view()直接返回映射内存的切片（零拷贝）
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._zip = zipfile.ZipFile(self._map)
+        self._entries = {info.filename: info for info in self._zip.infolist()}
+
+    @classmethod
+    def open(cls, path):
+        """打开资源包，文件不存在或损坏时返回None"""
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls(path)
+        except (OSError, ValueError, zipfile.BadZipFile) as e:
+            print(f"加载资源包失败: {e}")
+            return None
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def fingerprint(self, name):
+        """返回资源的 (CRC32, 字节数)，取自zip目录，无需读取内容"""
+        info = self._entries[name]
+        return info.CRC, info.file_size
+
+    def view(self, name):
+        """返回资源内容的memoryview，资源不存在时抛出FileNotFoundError"""
+        info = self._entries.get(name)
+        if info is None:
+            raise FileNotFoundError(f"{self.path}/{name}")
+        if info.compress_type != zipfile.ZIP_STORED:
+            return memoryview(self._zip.read(info))
+
+        offset = info.header_offset
+        signature, name_length, extra_length = _LOCAL_HEADER.unpack_from(self._map, offset)
+        if signature != _LOCAL_HEADER_SIGNATURE:
+            raise zipfile.BadZipFile(f"资源 {name} 的文件头损坏")
+        start = offset + _LOCAL_HEADER.size + name_length + extra_length
+        return memoryview(self._map)[start:start + info.file_size]
+
+    def read(self, name):
+        """返回资源内容的bytes副本"""
+        return bytes(self.view(name))
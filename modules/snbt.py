@@ -0,0 +1,273 @@
+## Copyright (c) 2025 Radium-bit
+## SPDX-License-Identifier: GPL-V3
+## See LICENSE file for full terms
+import re
+
+# 与Minecraft一致的嵌套深度上限
+MAX_DEPTH = 512
+
+_UNQUOTED_RE = re.compile(r"[0-9A-Za-z_\-.+]+")
+_WHITESPACE_RE = re.compile(r"\s*")
+_DOUBLE_QUOTE_STOP_RE = re.compile(r'["\\]')
+_SINGLE_QUOTE_STOP_RE = re.compile(r"['\\]")
+
+# 无引号值的数值类型判定（与Minecraft TagParser的规则一致，大小写不敏感）
+_FLOAT_RE = re.compile(r"[-+]?(?:[0-9]+[.]?|[0-9]*[.][0-9]+)(?:e[-+]?[0-9]+)?f", re.I)
+_DOUBLE_RE = re.compile(r"[-+]?(?:[0-9]+[.]?|[0-9]*[.][0-9]+)(?:e[-+]?[0-9]+)?d", re.I)
+_DOUBLE_NO_SUFFIX_RE = re.compile(r"[-+]?(?:[0-9]+[.]|[0-9]*[.][0-9]+)(?:e[-+]?[0-9]+)?", re.I)
+_INTEGER_RE = re.compile(r"[-+]?(?:0|[1-9][0-9]*)([bsl]?)", re.I)
+
+_INTEGER_RANGES = {
+    "byte": (-2 ** 7, 2 ** 7 - 1),
+    "short": (-2 ** 15, 2 ** 15 - 1),
+    "int": (-2 ** 31, 2 ** 31 - 1),
+    "long": (-2 ** 63, 2 ** 63 - 1),
+}
+_INTEGER_SUFFIXES = {"b": "byte", "s": "short", "l": "long", "": "int"}
+_ARRAY_KINDS = {"B": ("byte_array", "byte"), "I": ("int_array", "int"), "L": ("long_array", "long")}
+
+
+class SnbtError(ValueError):
+    """SNBT语法错误，position为出错字符在输入中的位置（从0开始）"""
+
+    def __init__(self, message, position):
+        super().__init__(f"{message}（位置 {position}）")
+        self.position = position
+
+
+class SnbtNode:
+    """
+    SNBT语法树节点
+    kind: compound/list/byte_array/int_array/long_array/string/byte/short/int/long/float/double
+    value: compound为{键: 节点}，列表和数组为[节点]，字符串为str，数值为int/float
+    start/end: 节点在源文本中的区间，可直接切片取回原文，无需重新序列化
+    """
+    __slots__ = ("kind", "value", "start", "end")
+
+    def __init__(self, kind, value, start, end):
+        self.kind = kind
+        self.value = value
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"SnbtNode({self.kind}, {self.value!r})"
+
+    def to_snbt(self):
+        """输出规范化的SNBT文本"""
+        if self.kind == "compound":
+            return "{" + ",".join(f"{_quote_key(k)}:{v.to_snbt()}" for k, v in self.value.items()) + "}"
+        if self.kind == "list":
+            return "[" + ",".join(v.to_snbt() for v in self.value) + "]"
+        if self.kind.endswith("_array"):
+            prefix = self.kind[0].upper()
+            return f"[{prefix};" + ",".join(v.to_snbt() for v in self.value) + "]"
+        if self.kind == "string":
+            return '"' + self.value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+        suffix = {"byte": "b", "short": "s", "int": "", "long": "L", "float": "f", "double": "d"}[self.kind]
+        return f"{self.value}{suffix}"
+
+
+def _quote_key(key):
+    if _UNQUOTED_RE.fullmatch(key):
+        return key
+    return '"' + key.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class SnbtParser:
+    """单遍SNBT解析器，耗时与输入长度成线性关系"""
+
+    def __init__(self, text, pos=0):
+        self.text = text
+        self.pos = pos
+        self.depth = 0
+
+    def error(self, message, position=None):
+        return SnbtError(message, self.pos if position is None else position)
+
+    def skip_whitespace(self):
+        self.pos = _WHITESPACE_RE.match(self.text, self.pos).end()
+
+    def peek(self):
+        return self.text[self.pos] if self.pos < len(self.text) else ""
+
+    def expect(self, char):
+        self.skip_whitespace()
+        if self.peek() != char:
+            found = self.peek() or "输入结束"
+            raise self.error(f"期望 '{char}'，实际为 '{found}'")
+        self.pos += 1
+
+    def parse_value(self):
+        return self._value_parser()()
+
+    def _value_parser(self):
+        """
+        根据下一个字符选出对应的解析方法（只返回方法不调用），
+        使每层嵌套只占一个Python栈帧，MAX_DEPTH层嵌套不会触及递归上限
+        """
+        self.skip_whitespace()
+        char = self.peek()
+        if char == "{":
+            return self.parse_compound
+        if char == "[":
+            return self.parse_list_or_array
+        if char in ('"', "'"):
+            return self.parse_string
+        return self.parse_unquoted_value
+
+    def parse_string(self):
+        start = self.pos
+        return SnbtNode("string", self.parse_quoted(), start, self.pos)
+
+    def _enter(self):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise self.error(f"嵌套层数超过 {MAX_DEPTH}")
+
+    def parse_compound(self):
+        start = self.pos
+        self._enter()
+        self.expect("{")
+        entries = {}
+        self.skip_whitespace()
+        while self.peek() != "}":
+            key_pos = self.pos
+            key = self.parse_key()
+            if not key:
+                raise self.error("期望键名", key_pos)
+            self.expect(":")
+            entries[key] = self._value_parser()()
+            if not self._separator():
+                break
+        self.expect("}")
+        self.depth -= 1
+        return SnbtNode("compound", entries, start, self.pos)
+
+    def parse_key(self):
+        self.skip_whitespace()
+        if self.peek() in ('"', "'"):
+            return self.parse_quoted()
+        match = _UNQUOTED_RE.match(self.text, self.pos)
+        if not match:
+            return ""
+        self.pos = match.end()
+        return match.group()
+
+    def _separator(self):
+        """读取元素间的逗号，允许末尾多余的逗号（与Minecraft一致）"""
+        self.skip_whitespace()
+        if self.peek() == ",":
+            self.pos += 1
+            self.skip_whitespace()
+            if self.pos >= len(self.text):
+                raise self.error("输入意外结束")
+            return True
+        return False
+
+    def parse_list_or_array(self):
+        start = self.pos
+        text = self.text
+        if (self.pos + 2 < len(text) and text[self.pos + 1] in _ARRAY_KINDS
+                and text[self.pos + 2] == ";"):
+            return self.parse_array(start)
+        self._enter()
+        self.expect("[")
+        items = []
+        element_kind = None
+        self.skip_whitespace()
+        while self.peek() != "]":
+            item_pos = self.pos
+            item = self._value_parser()()
+            if element_kind is None:
+                element_kind = item.kind
+            elif item.kind != element_kind:
+                raise self.error(f"列表元素类型不一致：不能将 {item.kind} 放入 {element_kind} 列表", item_pos)
+            items.append(item)
+            if not self._separator():
+                break
+        self.expect("]")
+        self.depth -= 1
+        return SnbtNode("list", items, start, self.pos)
+
+    def parse_array(self, start):
+        kind, element_kind = _ARRAY_KINDS[self.text[self.pos + 1]]
+        self.pos += 3
+        items = []
+        self.skip_whitespace()
+        while self.peek() != "]":
+            item_pos = self.pos
+            item = self._value_parser()()
+            if item.kind != element_kind:
+                raise self.error(f"不能将 {item.kind} 放入 {kind}", item_pos)
+            items.append(item)
+            if not self._separator():
+                break
+        self.expect("]")
+        return SnbtNode(kind, items, start, self.pos)
+
+    def parse_quoted(self):
+        """解析单引号或双引号字符串，支持反斜杠转义"""
+        quote = self.text[self.pos]
+        stop_re = _DOUBLE_QUOTE_STOP_RE if quote == '"' else _SINGLE_QUOTE_STOP_RE
+        start = self.pos
+        self.pos += 1
+        parts = []
+        while True:
+            match = stop_re.search(self.text, self.pos)
+            if not match:
+                raise self.error("字符串缺少结束引号", start)
+            parts.append(self.text[self.pos:match.start()])
+            self.pos = match.end()
+            if match.group() == quote:
+                return "".join(parts)
+            # 反斜杠转义：只允许转义反斜杠和引号
+            escaped = self.peek()
+            if escaped not in ("\\", '"', "'"):
+                raise self.error(f"无效的转义序列 '\\{escaped}'", self.pos - 1)
+            parts.append(escaped)
+            self.pos += 1
+
+    def parse_unquoted_value(self):
+        start = self.pos
+        match = _UNQUOTED_RE.match(self.text, self.pos)
+        if not match:
+            found = self.peek() or "输入结束"
+            raise self.error(f"期望值，实际为 '{found}'")
+        self.pos = match.end()
+        return SnbtNode(*_classify_unquoted(match.group()), start, self.pos)
+
+
+def _classify_unquoted(token):
+    """判断无引号值的类型，超出范围的数字按字符串处理（与Minecraft一致）"""
+    if _FLOAT_RE.fullmatch(token):
+        return "float", float(token[:-1])
+    if _DOUBLE_RE.fullmatch(token):
+        return "double", float(token[:-1])
+    match = _INTEGER_RE.fullmatch(token)
+    if match:
+        suffix = match.group(1).lower()
+        kind = _INTEGER_SUFFIXES[suffix]
+        value = int(token[:-1] if suffix else token)
+        low, high = _INTEGER_RANGES[kind]
+        if low <= value <= high:
+            return kind, value
+        return "string", token
+    if _DOUBLE_NO_SUFFIX_RE.fullmatch(token):
+        return "double", float(token)
+    lowered = token.lower()
+    if lowered == "true":
+        return "byte", 1
+    if lowered == "false":
+        return "byte", 0
+    return "string", token
+
+
+def parse_compound(text, pos=0):
+    """从text[pos]处解析一个compound，必须恰好占满剩余文本，返回SnbtNode"""
+    parser = SnbtParser(text, pos)
+    node = parser.parse_compound()
+    parser.skip_whitespace()
+    if parser.pos != len(text):
+        raise parser.error(f"compound结束后存在多余内容 '{text[parser.pos:parser.pos + 10]}'")
+    return node
@@ -0,0 +1,105 @@
+## Copyright (c) 2025 Radium-bit
+## SPDX-License-Identifier: GPL-V3
+## See LICENSE file for full terms
+import sys
+from modules.nbt_handler import NbtHandler
+
+AIR_ID = "minecraft:air"
+TRADE_TYPES = ("emerald_buy", "item_sell")
+# JSON中交易项必须包含的字段（buy2_id/buy2_count可省略）
+REQUIRED_FIELDS = ("buy_id", "buy_count", "sell_id", "sell_count", "max_uses", "trade_type")
+
+# 所有交易项共用的NBT解析器（带缓存，相同物品字符串只解析一次）
+_nbt_handler = NbtHandler()
+
+
+class Trade:
+    """
+    单个交易项，创建时完成校验和转换：
+    数量为int，物品ID字符串驻留（intern），物品预先解析为 (完整物品ID, NBT标签) 的
+    buy_item/buy2_item/sell_item，渲染和生成指令时无需再次解析
+    仅在读写JSON时与字符串字典互相转换（from_dict/to_dict）
+    """
+    __slots__ = (
+        "buy_id", "buy_count", "buy2_id", "buy2_count", "sell_id", "sell_count",
+        "max_uses", "trade_type", "buy_item", "buy2_item", "sell_item"
+    )
+
+    def __init__(self, buy_id, buy_count, sell_id, sell_count, max_uses, trade_type,
+                 buy2_id=AIR_ID, buy2_count=1):
+        if min(buy_count, buy2_count, sell_count, max_uses) <= 0:
+            raise ValueError("数量和maxUses必须大于0！")
+        if trade_type not in TRADE_TYPES:
+            raise ValueError(f"未知的交易类型：{trade_type}")
+        self.buy_id = sys.intern(buy_id)
+        self.buy2_id = sys.intern(buy2_id)
+        self.sell_id = sys.intern(sell_id)
+        self.buy_count = buy_count
+        self.buy2_count = buy2_count
+        self.sell_count = sell_count
+        self.max_uses = max_uses
+        self.trade_type = trade_type
+        # 物品格式错误时抛出ValueError
+        self.buy_item = self._parse_item(buy_id)
+        self.buy2_item = self._parse_item(buy2_id)
+        self.sell_item = self._parse_item(sell_id)
+
+    @staticmethod
+    def _parse_item(item_input):
+        item_id, nbt_tags = _nbt_handler.parse_item_with_nbt(item_input)
+        return (sys.intern(item_id), nbt_tags)
+
+    @property
+    def has_buy2(self):
+        """是否设置了第二个购买物品（默认的1个空气视为未设置）"""
+        return self.buy2_item != (AIR_ID, None) or self.buy2_count != 1
+
+    def reversed(self):
+        """返回反转后的交易项（原输出物品变为输入，原第一个输入物品变为输出，丢弃第二个输入物品）"""
+        return Trade(
+            buy_id=self.sell_id,
+            buy_count=self.sell_count,
+            sell_id=self.buy_id,
+            sell_count=self.buy_count,
+            max_uses=self.max_uses,
+            trade_type="item_sell" if self.trade_type == "emerald_buy" else "emerald_buy"
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        """从JSON字典创建交易项（数量可以是字符串或整数），结构或数值错误时抛出ValueError"""
+        if not isinstance(data, dict) or not all(field in data for field in REQUIRED_FIELDS):
+            raise ValueError(f"交易项结构错误：{data}")
+        try:
+            counts = [int(data[field]) for field in ("buy_count", "sell_count", "max_uses")]
+            buy2_count = int(data.get("buy2_count", 1))
+        except (TypeError, ValueError):
+            raise ValueError(f"数量和maxUses必须是正整数：{data}")
+        return cls(
+            buy_id=str(data["buy_id"]).strip(),
+            buy_count=counts[0],
+            sell_id=str(data["sell_id"]).strip(),
+            sell_count=counts[1],
+            max_uses=counts[2],
+            trade_type=data["trade_type"],
+            buy2_id=str(data.get("buy2_id") or AIR_ID).strip(),
+            buy2_count=buy2_count
+        )
+
+    def to_dict(self):
+        """转换为JSON字典（数量保存为字符串，与旧版配置文件格式一致）"""
+        return {
+            "buy_id": self.buy_id,
+            "buy_count": str(self.buy_count),
+            "buy2_id": self.buy2_id,
+            "buy2_count": str(self.buy2_count),
+            "sell_id": self.sell_id,
+            "sell_count": str(self.sell_count),
+            "max_uses": str(self.max_uses),
+            "trade_type": self.trade_type
+        }
+
+    def __repr__(self):
+        return (f"Trade({self.buy_id} x{self.buy_count}"
+                + (f" + {self.buy2_id} x{self.buy2_count}" if self.has_buy2 else "")
+                + f" -> {self.sell_id} x{self.sell_count}, maxUses={self.max_uses})")
@@ -1,66 +1,271 @@
 ## Copyright (c) 2025 Radium-bit
 ## SPDX-License-Identifier: GPL-V3
 ## See LICENSE file for full terms
+import itertools
+from collections import deque
+from modules.trade import Trade
+
+# 默认保留的撤销步数
+DEFAULT_HISTORY_DEPTH = 100
+
+
 class TradeManager:
-    """管理交易项的核心类，负责交易项的添加、修改、删除等操作"""
+    """
+    管理交易项的核心类，负责交易项的添加、修改、删除等操作
+    trades 为 Trade 对象列表，trade_ids 为与之一一对应的稳定ID
+    （交易项移动、修改或其他项被删除时ID不变，可用于在界面中定位交易项）
+    每次修改后向监听者发送变更事件，事件格式为 (类型, *参数)：
+      ("reset",)                 交易项整体替换
+      ("insert", index, count)   在index处插入count项
+      ("update", index)          index处的交易项被修改
+      ("delete", indices, ids)   删除的索引（升序，均为删除前的索引）及对应的ID
+      ("swap", index1, index2)   两项互换位置
+      ("move", start, stop)      索引在[start, stop)范围内的交易项重新排列
+    撤销/重做基于操作日志：每步只记录 (撤销操作, 重做操作)，不复制交易项列表，
+    整体替换、修改、交换每步占用O(1)，添加、删除、块移动每步只记录涉及的k项；
+    撤销删除时恢复原ID，界面中的行ID保持一致
+    """
     
-    def __init__(self):
+    def __init__(self, history_depth=DEFAULT_HISTORY_DEPTH):
         self.trades = []
+        self.trade_ids = []
+        self._next_id = itertools.count(1)
+        self._positions = {}  # 交易项ID → 当前索引，删除后置为None，下次查询时重建
+        self._listeners = []
+        self._undo = deque(maxlen=history_depth)  # [(撤销操作, 重做操作)]，超出深度时丢弃最早的
+        self._redo = []
+    
+    def add_listener(self, listener):
+        """注册变更监听者：listener(event, *args)"""
+        self._listeners.append(listener)
+    
+    def _notify(self, event, *args):
+        for listener in self._listeners:
+            listener(event, *args)
+    
+    def _new_ids(self, count):
+        return [next(self._next_id) for _ in range(count)]
+    
+    def index_of(self, trade_id):
+        """返回交易项ID当前的索引，ID不存在（已删除）时返回None"""
+        if self._positions is None:
+            self._positions = {tid: idx for idx, tid in enumerate(self.trade_ids)}
+        return self._positions.get(trade_id)
+    
+    # ---------------------- 撤销/重做 ----------------------
+    def _record(self, undo_op, redo_op):
+        """记录一步修改，操作格式为 (方法名, *参数)；新的修改会清空重做记录"""
+        self._undo.append((undo_op, redo_op))
+        self._redo.clear()
+    
+    def _apply(self, op):
+        name, *args = op
+        getattr(self, name)(*args)
+    
+    def can_undo(self):
+        return bool(self._undo)
+    
+    def can_redo(self):
+        return bool(self._redo)
+    
+    def undo(self):
+        """撤销上一步修改，没有可撤销的修改时返回False"""
+        if not self._undo:
+            return False
+        step = self._undo.pop()
+        self._apply(step[0])
+        self._redo.append(step)
+        return True
+    
+    def redo(self):
+        """重做上一步撤销的修改，没有可重做的修改时返回False"""
+        if not self._redo:
+            return False
+        step = self._redo.pop()
+        self._apply(step[1])
+        self._undo.append(step)
+        return True
+    
+    def clear_history(self):
+        self._undo.clear()
+        self._redo.clear()
+    
+    # ---------------------- 基本操作（不记录历史，供公开方法和撤销/重做调用） ----------------------
+    def _reset(self, trades, trade_ids):
+        self.trades = trades
+        self.trade_ids = trade_ids
+        self._positions = None
+        self._notify("reset")
+    
+    def _insert(self, index, trades, trade_ids):
+        """在index处插入连续的交易项"""
+        if index == len(self.trades) and self._positions is not None:
+            self._positions.update((trade_id, index + offset) for offset, trade_id in enumerate(trade_ids))
+        else:
+            self._positions = None
+        self.trades[index:index] = trades
+        self.trade_ids[index:index] = trade_ids
+        self._notify("insert", index, len(trades))
+    
+    def _restore(self, indices, trades, trade_ids):
+        """把删除的交易项按原索引（升序）放回，连续的一段发送一次插入事件"""
+        run_start = 0
+        for pos in range(1, len(indices) + 1):
+            if pos == len(indices) or indices[pos] != indices[pos - 1] + 1:
+                self._insert(indices[run_start], trades[run_start:pos], trade_ids[run_start:pos])
+                run_start = pos
+    
+    def _replace(self, index, trade):
+        self.trades[index] = trade
+        self._notify("update", index)
+    
+    def _remove(self, indices):
+        """删除升序索引处的交易项，返回删除的 (交易项, ID)"""
+        removed_trades = [self.trades[idx] for idx in indices]
+        removed_ids = [self.trade_ids[idx] for idx in indices]
+        # 逆序删除避免索引偏移
+        for idx in reversed(indices):
+            del self.trades[idx]
+            del self.trade_ids[idx]
+        self._positions = None
+        self._notify("delete", list(indices), removed_ids)
+        return removed_trades, removed_ids
+    
+    def _swap(self, index1, index2):
+        self.trades[index1], self.trades[index2] = self.trades[index2], self.trades[index1]
+        ids = self.trade_ids
+        ids[index1], ids[index2] = ids[index2], ids[index1]
+        if self._positions is not None:
+            self._positions[ids[index1]] = index1
+            self._positions[ids[index2]] = index2
+        self._notify("swap", index1, index2)
+    
+    def _reorder(self, selected, targets):
+        """
+        把selected（升序）中的交易项放到targets（升序）位置，其余交易项按原顺序填入空位，一次遍历完成
+        其余交易项的相对顺序不变，因此 _reorder(targets, selected) 即为逆操作
+        返回是否有交易项移动
+        """
+        count = len(self.trades)
+        order = [None] * count
+        for idx, target in zip(selected, targets):
+            order[target] = idx
+        selected_set = set(selected)
+        rest = (idx for idx in range(count) if idx not in selected_set)
+        order = [next(rest) if idx is None else idx for idx in order]
+        
+        changed = [pos for pos, idx in enumerate(order) if pos != idx]
+        if not changed:
+            return False
+        start, stop = changed[0], changed[-1] + 1
+        self.trades[start:stop] = [self.trades[idx] for idx in order[start:stop]]
+        self.trade_ids[start:stop] = [self.trade_ids[idx] for idx in order[start:stop]]
+        if self._positions is not None:
+            for pos in range(start, stop):
+                self._positions[self.trade_ids[pos]] = pos
+        self._notify("move", start, stop)
+        return True
+    
+    # ---------------------- 公开操作（可撤销） ----------------------
+    def set_trades(self, trades):
+        """整体替换交易项"""
+        old_trades, old_ids = self.trades, self.trade_ids
+        trade_ids = self._new_ids(len(trades))
+        self._reset(trades, trade_ids)
+        self._record(("_reset", old_trades, old_ids), ("_reset", trades, trade_ids))
+    
+    def load_trades(self, trades):
+        """
+        载入配置中的交易项（作为新的初始状态，不可撤销并清空历史）
+        村民名称和职业随配置一起载入但不在历史中，撤销时若只恢复交易项会与其不一致
+        """
+        self._reset(list(trades), self._new_ids(len(trades)))
+        self.clear_history()
     
     def init_default_trades(self):
-        """初始化默认交易项"""
-        self.trades = [
-            {
-                "buy_id": "minecraft:emerald", 
-                "buy_count": "1", 
-                "buy2_id": "minecraft:air",
-                "buy2_count": "1",
-                "sell_id": "minecraft:grass_block", 
-                "sell_count": "1", 
-                "max_uses": "256",
-                "trade_type": "emerald_buy"
-            }
-        ]
+        """初始化默认交易项（作为初始状态，不可撤销）"""
+        self._reset(
+            [
+                Trade(
+                    buy_id="minecraft:emerald",
+                    buy_count=1,
+                    sell_id="minecraft:grass_block",
+                    sell_count=1,
+                    max_uses=256,
+                    trade_type="emerald_buy"
+                )
+            ],
+            self._new_ids(1)
+        )
+        self.clear_history()
     
     def add_trade(self, trade):
         """添加新交易项"""
-        self.trades.append(trade)
+        self.add_trades([trade])
     
     def add_trades(self, trades):
         """批量添加交易项"""
-        self.trades.extend(trades)
+        if not trades:
+            return
+        index = len(self.trades)
+        trades = list(trades)
+        trade_ids = self._new_ids(len(trades))
+        self._insert(index, trades, trade_ids)
+        self._record(("_remove", range(index, index + len(trades))), ("_insert", index, trades, trade_ids))
     
     def update_trade(self, index, trade):
-        """更新指定索引的交易项"""
+        """更新指定索引的交易项（ID不变）"""
         if 0 <= index < len(self.trades):
-            self.trades[index] = trade
+            old_trade = self.trades[index]
+            self._replace(index, trade)
+            self._record(("_replace", index, old_trade), ("_replace", index, trade))
     
     def delete_trades(self, indices):
         """删除指定索引的交易项"""
-        # 逆序删除避免索引偏移
-        for idx in sorted(indices, reverse=True):
-            if 0 <= idx < len(self.trades):
-                del self.trades[idx]
+        valid = sorted({idx for idx in indices if 0 <= idx < len(self.trades)})
+        if not valid:
+            return
+        removed_trades, removed_ids = self._remove(valid)
+        self._record(("_restore", valid, removed_trades, removed_ids), ("_remove", valid))
     
     def swap_trades(self, index1, index2):
         """交换两个交易项的位置"""
-        if 0 <= index1 < len(self.trades) and 0 <= index2 < len(self.trades):
-            self.trades[index1], self.trades[index2] = self.trades[index2], self.trades[index1]
+        if index1 != index2 and 0 <= index1 < len(self.trades) and 0 <= index2 < len(self.trades):
+            self._swap(index1, index2)
+            self._record(("_swap", index1, index2), ("_swap", index1, index2))
+    
+    def move_trades(self, indices, offset):
+        """
+        把选中的交易项移动offset位（负数上移、正数下移），保持相对顺序；
+        到达边界的项停住，其后的选中项依次紧挨着停下（与逐项逐步移动的结果相同）
+        """
+        selected = sorted({idx for idx in indices if 0 <= idx < len(self.trades)})
+        if not selected or offset == 0:
+            return
+        # 选中项的目标位置严格递增，其余交易项按原顺序填入空位
+        if offset < 0:
+            targets = [max(idx + offset, rank) for rank, idx in enumerate(selected)]
+        else:
+            limit = len(self.trades) - len(selected)
+            targets = [min(idx + offset, limit + rank) for rank, idx in enumerate(selected)]
+        self._move(selected, targets)
+    
+    def move_trades_to(self, indices, before):
+        """
+        把选中的交易项按原顺序连续放到索引before处的交易项之前（before为交易项数时放到末尾），
+        用于置顶、置底和拖放排序；before处的交易项也被选中时放到其后第一个未选中项之前
+        """
+        selected = sorted({idx for idx in indices if 0 <= idx < len(self.trades)})
+        if not selected:
+            return
+        selected_set = set(selected)
+        position = sum(1 for idx in range(min(before, len(self.trades))) if idx not in selected_set)
+        self._move(selected, range(position, position + len(selected)))
+    
+    def _move(self, selected, targets):
+        if self._reorder(selected, targets):
+            self._record(("_reorder", targets, selected), ("_reorder", selected, targets))
     
     def reverse_trades(self):
         """反转交易项（考虑村民只能输出一种物品，调整反转逻辑）"""
-        reversed_trades = []
-        for trade in self.trades:
-            reversed_trade = {
-                # 原输出物品变为新的输入物品
-                "buy_id": trade["sell_id"],
-                "buy_count": trade["sell_count"],
-                # 原第一个输入物品变为新的输出物品（丢弃原第二个输入物品）
-                "sell_id": trade["buy_id"],
-                "sell_count": trade["buy_count"],
-                "max_uses": trade["max_uses"],
-                # 切换交易类型
-                "trade_type": "item_sell" if trade["trade_type"] == "emerald_buy" else "emerald_buy"
-            }
-            reversed_trades.append(reversed_trade)
-        return reversed_trades
+        return [trade.reversed() for trade in self.trades]
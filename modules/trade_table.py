@@ -0,0 +1,267 @@
+## Copyright (c) 2025 Radium-bit
+## SPDX-License-Identifier: GPL-V3
+## See LICENSE file for full terms
+import tkinter as tk
+
+HEADER_BG = "#f0f0f0"
+HEADER_BORDER = "#c8c8c8"
+SELECT_BG = "#cce8ff"
+
+
+class TradeTable(tk.Canvas):
+    """
+    交易列表表格：所有行画在同一个Canvas上，只绘制可视区域内的行，
+    每个物品列都能显示图标（Treeview只能在#0列显示图标）
+    行由调用方的键（字符串，如交易项行ID）标识，并提供交易列表用到的Treeview接口子集
+    （selection/selection_set/identify_row/identify_column/index/see/yview/xview），可替换Treeview使用
+    columns: [(列名, 标题, 宽度, 是否拉伸)]，画布较宽时剩余宽度平均分给可拉伸的列
+    render_row(key, index) 返回 (背景色, [(文本, 图标或None), ...])，单元格与columns一一对应；
+    只有图标的单元格图标居中，同时有图标和文本时图标靠左、文本在其右侧
+    """
+
+    def __init__(self, parent, columns, render_row, row_height=36, header_height=24,
+                 yscrollcommand=None, xscrollcommand=None, **canvas_options):
+        canvas_options.setdefault("background", "white")
+        canvas_options.setdefault("highlightthickness", 0)
+        super().__init__(parent, **canvas_options)
+        self.columns = columns
+        self.render_row = render_row
+        self.row_height = row_height
+        self.header_height = header_height
+        self.yscrollcommand = yscrollcommand
+        self.xscrollcommand = xscrollcommand
+        self.keys = []             # 当前按显示顺序排列的行键
+        self.top = 0               # 可视区域顶部在全部行中的像素位置
+        self.left = 0              # 可视区域左边在全部列中的像素位置
+        self._positions = {}       # {key: 在keys中的位置}
+        self._selection = set()
+        self._anchor = None        # Shift多选的起点
+        self._redraw_id = None
+
+        # 选中处理放在类绑定中，在控件自身的绑定（如拖放排序）之后执行，与Treeview一致
+        self.bindtags((str(self), "TradeTable") + self.bindtags()[1:])
+        self.bind_class("TradeTable", "<ButtonPress-1>", lambda e: e.widget._on_click(e))
+        self.bind_class("TradeTable", "<Up>", lambda e: e.widget._move_selection(-1))
+        self.bind_class("TradeTable", "<Down>", lambda e: e.widget._move_selection(1))
+        self.bind_class("TradeTable", "<Configure>", lambda e: e.widget.schedule_redraw())
+
+    # ---------------------- 数据与绘制 ----------------------
+    def set_keys(self, keys):
+        """替换行键（保留滚动位置，已不存在的行从选中中移除）并重绘"""
+        self.keys = list(keys)
+        self._positions = {key: pos for pos, key in enumerate(self.keys)}
+        self._selection.intersection_update(self._positions)
+        if self._anchor not in self._positions:
+            self._anchor = None
+        self.schedule_redraw()
+
+    def schedule_redraw(self, *_):
+        """在空闲时重绘（多次调用合并为一次），可直接用作图标加载完成的回调"""
+        if self._redraw_id is None:
+            self._redraw_id = self.after_idle(self.redraw)
+
+    def redraw(self):
+        """清空画布，只绘制表头和可视区域内的行"""
+        if self._redraw_id is not None:
+            self.after_cancel(self._redraw_id)
+            self._redraw_id = None
+        self.delete("all")
+        widths = self._column_widths()
+        self._clamp_view(widths)
+        body_height = self._body_height()
+
+        first = self.top // self.row_height
+        last = min((self.top + body_height) // self.row_height + 1, len(self.keys))
+        for index in range(first, last):
+            self._draw_row(index, self.header_height + index * self.row_height - self.top, widths)
+        # 表头最后绘制，覆盖滚动到顶部之外的半行
+        self._draw_header(widths)
+        self._update_scrollbars(widths)
+
+    def _column_widths(self):
+        widths = [column[2] for column in self.columns]
+        stretch = [i for i, column in enumerate(self.columns) if column[3]]
+        extra = self.winfo_width() - sum(widths)
+        if extra > 0 and stretch:
+            for i in stretch:
+                widths[i] += extra // len(stretch)
+        return widths
+
+    def _body_height(self):
+        return max(self.winfo_height() - self.header_height, 0)
+
+    def _clamp_view(self, widths):
+        self.top = min(max(self.top, 0), max(len(self.keys) * self.row_height - self._body_height(), 0))
+        self.left = min(max(self.left, 0), max(sum(widths) - self.winfo_width(), 0))
+
+    def _draw_row(self, index, y, widths):
+        key = self.keys[index]
+        background, cells = self.render_row(key, index)
+        if key in self._selection:
+            background = SELECT_BG
+        middle = y + self.row_height // 2
+        x = -self.left
+        for width, (text, image) in zip(widths, cells):
+            # 每个单元格先画自己的底色，盖住前一列超出列宽的文本
+            self.create_rectangle(x, y, x + width, y + self.row_height, fill=background, outline="")
+            text_x = x + 4
+            if image is not None and text == "":
+                self.create_image(x + width // 2, middle, image=image)
+            elif image is not None:
+                # 图标靠左，文本画在图标右侧
+                self.create_image(text_x, middle, image=image, anchor=tk.W)
+                text_x += image.width() + 4
+            if text != "":
+                self.create_text(text_x, middle, text=text, anchor=tk.W)
+            x += width
+
+    def _draw_header(self, widths):
+        x = -self.left
+        for width, column in zip(widths, self.columns):
+            self.create_rectangle(x, 0, x + width, self.header_height, fill=HEADER_BG, outline=HEADER_BORDER)
+            if column[1]:
+                self.create_text(x + width // 2, self.header_height // 2, text=column[1])
+            x += width
+
+    def _update_scrollbars(self, widths):
+        total_height = len(self.keys) * self.row_height
+        if self.yscrollcommand:
+            self.yscrollcommand(*self._fractions(self.top, self._body_height(), total_height))
+        if self.xscrollcommand:
+            self.xscrollcommand(*self._fractions(self.left, self.winfo_width(), sum(widths)))
+
+    @staticmethod
+    def _fractions(start, visible, total):
+        if total <= 0:
+            return 0.0, 1.0
+        return start / total, min((start + visible) / total, 1.0)
+
+    # ---------------------- 滚动（与Treeview的yview/xview协议一致） ----------------------
+    def yview(self, *args):
+        """无参数时返回可视范围 (起点, 终点)；否则按 moveto/scroll 参数滚动"""
+        total = len(self.keys) * self.row_height
+        if not args:
+            return self._fractions(self.top, self._body_height(), total)
+        self.top = self._scrolled(self.top, total, self.row_height, self._body_height(), args)
+        self._clamp_view(self._column_widths())
+        self.schedule_redraw()
+
+    def xview(self, *args):
+        """无参数时返回可视范围 (起点, 终点)；否则按 moveto/scroll 参数滚动"""
+        total = sum(self._column_widths())
+        if not args:
+            return self._fractions(self.left, self.winfo_width(), total)
+        self.left = self._scrolled(self.left, total, 20, self.winfo_width(), args)
+        self._clamp_view(self._column_widths())
+        self.schedule_redraw()
+
+    @staticmethod
+    def _scrolled(position, total, unit, page, args):
+        if args[0] == "moveto":
+            return int(float(args[1]) * total)
+        if args[0] == "scroll":
+            step = page if args[2] == "pages" else unit
+            return position + int(args[1]) * step
+        return position
+
+    def yview_moveto(self, fraction):
+        self.yview("moveto", fraction)
+
+    def yview_scroll(self, number, what):
+        self.yview("scroll", number, what)
+
+    def xview_moveto(self, fraction):
+        self.xview("moveto", fraction)
+
+    def xview_scroll(self, number, what):
+        self.xview("scroll", number, what)
+
+    def see(self, key):
+        """滚动使行完整可见"""
+        pos = self._positions.get(key)
+        if pos is None:
+            return
+        y = pos * self.row_height
+        if y < self.top:
+            self.top = y
+        elif y + self.row_height > self.top + self._body_height():
+            self.top = y + self.row_height - self._body_height()
+        self.schedule_redraw()
+
+    # ---------------------- 定位与选中（Treeview接口子集） ----------------------
+    def identify_row(self, y):
+        """返回y坐标处的行键，不在行上时返回空字符串"""
+        if y < self.header_height:
+            return ""
+        pos = (y - self.header_height + self.top) // self.row_height
+        return self.keys[pos] if 0 <= pos < len(self.keys) else ""
+
+    def identify_column(self, x):
+        """返回x坐标处的列号（"#1"起），与Treeview一致"""
+        x += self.left
+        for number, width in enumerate(self._column_widths(), 1):
+            if x < width:
+                return f"#{number}"
+            x -= width
+        return ""
+
+    def index(self, key):
+        """返回行的位置"""
+        return self._positions[key]
+
+    def selection(self):
+        """按显示顺序返回选中的行键"""
+        return tuple(sorted(self._selection, key=self._positions.__getitem__))
+
+    def selection_set(self, *keys):
+        self._selection = set()
+        self._anchor = None
+        self.selection_add(*keys)
+
+    def selection_add(self, *keys):
+        for key in self._flatten(keys):
+            if key in self._positions:
+                self._selection.add(key)
+                if self._anchor is None:
+                    self._anchor = key
+        self.schedule_redraw()
+
+    def selection_remove(self, *keys):
+        self._selection.difference_update(self._flatten(keys))
+        self.schedule_redraw()
+
+    @staticmethod
+    def _flatten(keys):
+        for key in keys:
+            if isinstance(key, (list, tuple)):
+                yield from key
+            else:
+                yield key
+
+    def _on_click(self, event):
+        """单击选中一行，Ctrl单击切换选中，Shift单击选中到起点之间的所有行"""
+        self.focus_set()
+        key = self.identify_row(event.y)
+        if not key:
+            return
+        if event.state & 0x0004:
+            self._selection ^= {key}
+            self._anchor = key
+        elif event.state & 0x0001 and self._anchor is not None:
+            start, end = sorted((self._positions[self._anchor], self._positions[key]))
+            self._selection = set(self.keys[start:end + 1])
+        else:
+            self._selection = {key}
+            self._anchor = key
+        self.schedule_redraw()
+
+    def _move_selection(self, step):
+        """键盘上下移动选中行"""
+        if not self.keys:
+            return "break"
+        pos = self._positions.get(self._anchor)
+        pos = 0 if pos is None else min(max(pos + step, 0), len(self.keys) - 1)
+        self._anchor = self.keys[pos]
+        self._selection = {self._anchor}
+        self.see(self._anchor)
+        return "break"
@@ -1,18 +1,52 @@
 import os
 import sys
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from modules.trade_manager import TradeManager
+from modules.trade import Trade
 from modules.nbt_handler import NbtHandler
-from modules.command_generator import CommandGenerator
+from modules.command_generator import CommandGenerator, DEFAULT_COMMAND_BUDGET
 from modules.config_handler import ConfigHandler
+from modules.icon_provider import IconProvider, IconDiskCache, user_cache_dir
+from modules.item_catalog import load_item_catalog
+from modules.icon_atlas import IconAtlas
+from modules.resource_archive import ResourceArchive, RESOURCE_ARCHIVE_NAME
+from modules.item_search import ItemSearchIndex
+from modules.virtual_list import VirtualTreeview
+from modules.trade_table import TradeTable
 import json
 from pathlib import Path
-from PIL import Image, ImageTk
+
+# 交易列表的行样式标签：所有行共用这几个固定标签（交易类型 × 奇偶行），标签数量不随行数增长
+TRADE_ROW_STYLES = {
+    "emerald_buy_even": "#e8f8e8",
+    "emerald_buy_odd": "#d8e8d8",
+    "item_sell_even": "#f8e8f8",
+    "item_sell_odd": "#e8d8e8",
+}
+HOVER_TAG = "hover"
+HOVER_BG = "#ffffcc"
+# 鼠标移动事件合并处理的间隔（毫秒，约一帧）
+HOVER_FRAME_MS = 16
+# 交易列表的列：(列名, 标题, 宽度, 最小宽度, 是否拉伸)
+TRADE_COLUMNS = (
+    ("buy_icon", "", 40, 40, False),
+    ("buy_item", "Buy物品ID", 150, 100, True),
+    ("buy_count", "数量", 60, 50, False),
+    ("buy2_icon", "", 40, 40, False),
+    ("buy2_item", "Buy2物品ID", 150, 100, True),
+    ("buy2_count", "数量", 60, 50, False),
+    ("arrow", "", 30, 30, False),
+    ("sell_icon", "Sell物品", 40, 40, False),
+    ("sell_item", "物品ID", 150, 100, True),
+    ("sell_count", "数量", 60, 50, False),
+    ("max_uses", "最大可售", 80, 70, False),
+)
 
 
 class MainWindow:
-    def __init__(self, root):
+    def __init__(self, root, icon_cache_size=256, virtual_list_threshold=2000, canvas_trade_table=False):
         # 初始化核心模块
         self.nbt_handler = NbtHandler()
         self.trade_manager = TradeManager()
@@ -20,6 +54,8 @@ class MainWindow:
         self.config_handler = ConfigHandler(self)
         # 程序基路径
         self.base_path = None
+        # 打包时生成的资源包（res.zip），存在时资源直接从中读取
+        self.resources = None
         # 加载基路径
         self._ensure_base_path()
         
@@ -29,19 +65,31 @@ class MainWindow:
         self.root.geometry("1200x900")  # 增加宽度以适应多列
         
         # 存储UI状态
-        self.selected_edit_idx = None
+        self.selected_edit_id = None  # 正在编辑的交易项ID
         self.nbt_tooltip = None
         self.current_hover_item = None  # Treeview悬停行记录
-        self.original_bg = {}  # 存储行原始背景色
+        self.hover_cell = None  # 最近一次处理悬停时的 (行, 列)，未变化时跳过
+        self.hover_pointer = (0, 0, 0, 0)  # 最近一次鼠标移动的位置（控件内x, y, 屏幕x, 屏幕y）
+        self.hover_job = None  # 待处理的悬停任务（每帧最多一次）
+        self.canvas_trade_table = canvas_trade_table  # 交易列表使用Canvas表格（TradeTable）代替Treeview
+        self.row_trade_ids = {}  # Treeview行ID → 交易项ID（交易项ID → 行ID见_trade_row）
+        self.drag_trade_ids = None  # 拖放排序中被拖动的交易项ID
         
         # 物品选择功能相关属性（完整保留移植）
         self.items_data = self._load_items_json()  # 加载物品ID-名称表
-        self.icon_photo_refs = {}  # 用于保持图片引用，防止被垃圾回收
+        self._search_index = None   # 物品搜索索引（名称/ID/拼音），启动后在后台线程构建，见search_index
+        self._search_index_thread = None
         self.selector_win = None    # 物品选择弹窗实例
         self.selector_target = ""   # 标记目标输入框（buy/buy2）
-        self.icon_cache = {}  # 预缓存所有32x32图片：{item_id: PhotoImage对象}
+        self.virtual_list_threshold = virtual_list_threshold  # 物品数超过该值时选择器使用虚拟列表
+        self.item_list = None       # 虚拟列表模式下的VirtualTreeview实例
+        self.icon_cache_size = icon_cache_size  # 图标LRU缓存上限
+        self.icon_provider = None   # 按需加载的图标提供器
         self.default_icon = None    # 默认图标
         self.filter_delay_id = None # 防抖计数器
+        self.icon_refresh_id = None # 可见行图标刷新计数器
+        self.cmd_stream_id = None   # 交易指令分块写入文本框的计时器
+        self.cmd_stream_chunk = 64  # 每次写入文本框的交易项数
         
         # 创建带滚动条的主容器（保留之前的整体滚动功能）
         self.create_scrollable_container()
@@ -50,9 +98,51 @@ class MainWindow:
         self.create_widgets()
         
         # 初始化默认数据
-        self._preload_icons()  # 初始化时预加载所有图片
+        self._init_icon_provider()  # 图标改为按需加载，此处仅准备默认图标
+        self.trade_manager.add_listener(self._on_trades_changed)  # 交易项变更时局部刷新列表
         self.trade_manager.init_default_trades()
-        self.update_trade_listbox()
+        # 窗口显示后再构建搜索索引，不拖慢启动
+        self.root.after_idle(self._start_search_index_build)
+        # 关闭主窗口时先停止图标解码线程
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+
+    def _on_close(self):
+        """关闭主窗口：停止图标加载后销毁窗口"""
+        if self.icon_provider is not None:
+            self.icon_provider.shutdown()
+        self.root.destroy()
+
+    def _start_search_index_build(self):
+        """在后台线程构建物品搜索索引（首次打开选择器前已构建好时不再启动）"""
+        if self._search_index is not None or self._search_index_thread is not None:
+            return
+        self._search_index_thread = threading.Thread(
+            target=self._build_search_index, name="item-search-index", daemon=True
+        )
+        self._search_index_thread.start()
+
+    def _build_search_index(self):
+        """后台线程：构建失败时只记录原因，首次使用索引时在主线程重试"""
+        try:
+            self._search_index = ItemSearchIndex(self.items_data)
+        except Exception as e:
+            print(f"后台构建物品搜索索引失败: {e}")
+
+    @property
+    def search_index(self):
+        """
+        物品搜索索引，后台构建尚未完成时等待其完成；
+        未启动或后台构建失败时在主线程构建，仍失败时抛出RuntimeError（不会返回None）
+        """
+        if self._search_index is None:
+            if self._search_index_thread is not None:
+                self._search_index_thread.join()
+            if self._search_index is None:
+                try:
+                    self._search_index = ItemSearchIndex(self.items_data)
+                except Exception as e:
+                    raise RuntimeError(f"物品搜索索引构建失败：{e}") from e
+        return self._search_index
 
     def create_scrollable_container(self):
         """创建带滚动条的主容器，确保小屏幕可完整访问"""
@@ -138,6 +228,13 @@ class MainWindow:
             command=self.config_handler.load_config_from_json
         )
         self.load_btn.pack(side=tk.LEFT, padx=2, pady=2)
+        
+        self.export_btn = ttk.Button(
+            self.top_btn_frame, 
+            text="导出数据包", 
+            command=self.config_handler.export_datapack
+        )
+        self.export_btn.pack(side=tk.LEFT, padx=2, pady=2)
 
     def create_villager_info_area(self):
         """创建村民基础信息区域"""
@@ -279,6 +376,27 @@ class MainWindow:
         )
         self.reverse_btn.pack(side=tk.LEFT, padx=2, pady=2)
         
+        self.undo_btn = ttk.Button(
+            self.list_btn_frame, 
+            text="撤销", 
+            command=self.undo_trade_change
+        )
+        self.undo_btn.pack(side=tk.LEFT, padx=2, pady=2)
+        
+        self.redo_btn = ttk.Button(
+            self.list_btn_frame, 
+            text="重做", 
+            command=self.redo_trade_change
+        )
+        self.redo_btn.pack(side=tk.LEFT, padx=2, pady=2)
+        
+        self.move_top_btn = ttk.Button(
+            self.list_btn_frame, 
+            text="置顶选中项", 
+            command=self.move_trades_to_top
+        )
+        self.move_top_btn.pack(side=tk.LEFT, padx=2, pady=2)
+        
         self.move_up_btn = ttk.Button(
             self.list_btn_frame, 
             text="上移选中项", 
@@ -293,6 +411,13 @@ class MainWindow:
         )
         self.move_down_btn.pack(side=tk.LEFT, padx=2, pady=2)
         
+        self.move_bottom_btn = ttk.Button(
+            self.list_btn_frame, 
+            text="置底选中项", 
+            command=self.move_trades_to_bottom
+        )
+        self.move_bottom_btn.pack(side=tk.LEFT, padx=2, pady=2)
+        
         self.del_btn = ttk.Button(
             self.list_btn_frame, 
             text="删除选中交易（支持多选）", 
@@ -310,46 +435,17 @@ class MainWindow:
         # 配置多列Treeview（带图标）
         style = ttk.Style()
         style.configure("Treeview", rowheight=36)  # 适配32x32图标高度
-        self.trade_listbox = ttk.Treeview(
-            scroll_frame,
-            columns=(
-                "buy_icon", "buy_item", "buy_count",
-                "buy2_icon", "buy2_item", "buy2_count",
-                "arrow",
-                "sell_icon", "sell_item", "sell_count",
-                "max_uses"
-            ),
-            show="headings",
-            yscrollcommand=self.trade_v_scroll.set,
-            xscrollcommand=self.trade_h_scroll.set,
-            selectmode=tk.EXTENDED
-        )
-        
-        # 配置列标题和宽度
-        # self.trade_listbox.heading("buy_icon", text="Buy物品")
-        self.trade_listbox.heading("buy_item", text="Buy物品ID")
-        self.trade_listbox.heading("buy_count", text="数量")
-        # self.trade_listbox.heading("buy2_icon", text="Buy2物品")
-        self.trade_listbox.heading("buy2_item", text="Buy2物品ID")
-        self.trade_listbox.heading("buy2_count", text="数量")
-        self.trade_listbox.heading("arrow", text="")
-        self.trade_listbox.heading("sell_icon", text="Sell物品")
-        self.trade_listbox.heading("sell_item", text="物品ID")
-        self.trade_listbox.heading("sell_count", text="数量")
-        self.trade_listbox.heading("max_uses", text="最大可售")
-        
-        # 配置列宽
-        self.trade_listbox.column("buy_icon", width=40, minwidth=40, stretch=False)
-        self.trade_listbox.column("buy_item", width=150, minwidth=100)
-        self.trade_listbox.column("buy_count", width=60, minwidth=50, stretch=False)
-        self.trade_listbox.column("buy2_icon", width=40, minwidth=40, stretch=False)
-        self.trade_listbox.column("buy2_item", width=150, minwidth=100)
-        self.trade_listbox.column("buy2_count", width=60, minwidth=50, stretch=False)
-        self.trade_listbox.column("arrow", width=30, minwidth=30, stretch=False)
-        self.trade_listbox.column("sell_icon", width=40, minwidth=40, stretch=False)
-        self.trade_listbox.column("sell_item", width=150, minwidth=100)
-        self.trade_listbox.column("sell_count", width=60, minwidth=50, stretch=False)
-        self.trade_listbox.column("max_uses", width=80, minwidth=70, stretch=False)
+        if self.canvas_trade_table:
+            # Canvas表格：只绘制可视行，每个物品列都显示图标
+            self.trade_listbox = TradeTable(
+                scroll_frame,
+                columns=[(name, heading, width, stretch) for name, heading, width, _, stretch in TRADE_COLUMNS],
+                render_row=self._trade_table_row,
+                yscrollcommand=self.trade_v_scroll.set,
+                xscrollcommand=self.trade_h_scroll.set
+            )
+        else:
+            self._create_trade_treeview(scroll_frame)
         
         # 放置Treeview和滚动条
         self.trade_listbox.grid(row=0, column=0, sticky=tk.NSEW)
@@ -369,6 +465,15 @@ class MainWindow:
         self.trade_listbox.bind("<Button-3>", self.show_trade_right_click_menu)
         self.trade_listbox.bind("<Motion>", self.on_treeview_motion)
         self.trade_listbox.bind("<Leave>", self.on_treeview_leave)
+        # 拖放排序：拖动选中的交易项到目标行
+        self.trade_listbox.bind("<ButtonPress-1>", self._on_trade_drag_start)
+        self.trade_listbox.bind("<B1-Motion>", self._on_trade_drag_motion)
+        self.trade_listbox.bind("<ButtonRelease-1>", self._on_trade_drag_release)
+        # 撤销/重做快捷键（输入框中保留其自身行为）
+        for sequence in ("<Control-z>", "<Control-Z>"):
+            self.root.bind(sequence, lambda e: self._on_history_key(e, self.undo_trade_change))
+        for sequence in ("<Control-y>", "<Control-Y>"):
+            self.root.bind(sequence, lambda e: self._on_history_key(e, self.redo_trade_change))
         
         # 初始化右键菜单
         self.trade_right_menu = tk.Menu(self.root, tearoff=0)
@@ -377,6 +482,27 @@ class MainWindow:
             command=self.start_edit_selected_trade
         )
 
+    def _create_trade_treeview(self, parent):
+        """创建交易列表的Treeview，配置列和共用的样式标签"""
+        self.trade_listbox = ttk.Treeview(
+            parent,
+            columns=[column[0] for column in TRADE_COLUMNS],
+            show="headings",
+            yscrollcommand=self.trade_v_scroll.set,
+            xscrollcommand=self.trade_h_scroll.set,
+            selectmode=tk.EXTENDED
+        )
+        
+        # 配置列标题和宽度
+        for name, heading, width, minwidth, stretch in TRADE_COLUMNS:
+            self.trade_listbox.heading(name, text=heading)
+            self.trade_listbox.column(name, width=width, minwidth=minwidth, stretch=stretch)
+        
+        # 行样式和悬停标签只配置一次，所有行共用
+        for tag, background in TRADE_ROW_STYLES.items():
+            self.trade_listbox.tag_configure(tag, background=background)
+        self.trade_listbox.tag_configure(HOVER_TAG, background=HOVER_BG)
+
     def _on_trade_list_mousewheel(self, event):
         """交易列表内部滚动优先级处理：边界外允许外部滚动"""
         current_pos = self.trade_listbox.yview()
@@ -403,12 +529,26 @@ class MainWindow:
         )
         self.result_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
+        gen_bar = ttk.Frame(self.result_frame)
+        gen_bar.pack(anchor=tk.W, padx=5, pady=5)
         self.gen_btn = ttk.Button(
-            self.result_frame, 
+            gen_bar, 
             text="生成指令", 
             command=self.generate_command
         )
-        self.gen_btn.pack(anchor=tk.W, padx=5, pady=5)
+        self.gen_btn.pack(side=tk.LEFT)
+        
+        # 分段生成：交易列表指令超出命令方块长度上限时拆分为多条
+        self.chunk_commands_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            gen_bar,
+            text="分段生成交易指令，每条不超过",
+            variable=self.chunk_commands_var
+        ).pack(side=tk.LEFT, padx=(15, 2))
+        self.chunk_budget = ttk.Entry(gen_bar, width=8)
+        self.chunk_budget.insert(0, str(DEFAULT_COMMAND_BUDGET))
+        self.chunk_budget.pack(side=tk.LEFT)
+        ttk.Label(gen_bar, text="字节").pack(side=tk.LEFT, padx=2)
         
         # 选项卡容器
         self.notebook = ttk.Notebook(self.result_frame)
@@ -416,6 +556,7 @@ class MainWindow:
         
         # 存储每个选项卡的Text组件
         self.command_tabs = {}
+        self.extra_command_tabs = []  # 分段生成时追加的选项卡 [(名称, 选项卡Frame)]
         # 选项卡定义
         self.tab_definitions = [
             ("步骤1：设置村民自定义名称", "设置村民自定义名称"),
@@ -427,72 +568,76 @@ class MainWindow:
         
         # 创建每个选项卡
         for tab_name, tab_desc in self.tab_definitions:
-            tab_frame = ttk.Frame(self.notebook)
-            self.notebook.add(tab_frame, text=tab_name)
-            
-            # 选项卡说明
-            desc_label = ttk.Label(
-                tab_frame, 
-                text=f"说明：{tab_desc}", 
-                wraplength=900, 
-                justify=tk.LEFT
-            )
-            desc_label.pack(anchor=tk.W, padx=5, pady=2)
-            
-            # 命令显示文本框
-            cmd_text = tk.Text(tab_frame, wrap=tk.WORD, width=130, height=10)
-            cmd_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=2)
-            cmd_text.config(state=tk.DISABLED)
-            self.command_tabs[tab_name] = cmd_text
-            
-            # 复制按钮
-            copy_btn = ttk.Button(
-                tab_frame, 
-                text="复制命令到剪贴板", 
-                command=lambda txt=cmd_text: self.copy_command_to_clipboard(txt)
-            )
-            copy_btn.pack(anchor=tk.W, padx=5, pady=3)
+            tab_frame = self._create_command_tab(tab_name, tab_desc)
+        
+        # 交易列表指令可能很长，额外提供直接保存到文件
+        save_btn = ttk.Button(
+            tab_frame,
+            text="保存交易指令到文件",
+            command=self.save_trade_command_to_file
+        )
+        save_btn.pack(anchor=tk.W, padx=5, pady=3)
         
         # 设置默认选中最后一个选项卡
         self.notebook.select(len(self.tab_definitions) - 1)
 
+    def _create_command_tab(self, tab_name, tab_desc):
+        """创建一个指令选项卡（说明、只读文本框、复制按钮），返回选项卡Frame"""
+        tab_frame = ttk.Frame(self.notebook)
+        self.notebook.add(tab_frame, text=tab_name)
+        
+        # 选项卡说明
+        desc_label = ttk.Label(
+            tab_frame, 
+            text=f"说明：{tab_desc}", 
+            wraplength=900, 
+            justify=tk.LEFT
+        )
+        desc_label.pack(anchor=tk.W, padx=5, pady=2)
+        
+        # 命令显示文本框
+        cmd_text = tk.Text(tab_frame, wrap=tk.WORD, width=130, height=10)
+        cmd_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=2)
+        cmd_text.config(state=tk.DISABLED)
+        self.command_tabs[tab_name] = cmd_text
+        
+        # 复制按钮
+        copy_btn = ttk.Button(
+            tab_frame, 
+            text="复制命令到剪贴板", 
+            command=lambda txt=cmd_text: self.copy_command_to_clipboard(txt)
+        )
+        copy_btn.pack(anchor=tk.W, padx=5, pady=3)
+        return tab_frame
+
+    def _clear_extra_command_tabs(self):
+        """移除上次分段生成时追加的选项卡"""
+        for tab_name, tab_frame in self.extra_command_tabs:
+            self.command_tabs.pop(tab_name, None)
+            self.notebook.forget(tab_frame)
+            tab_frame.destroy()
+        self.extra_command_tabs.clear()
+
     # ---------------------- 物品选择弹窗相关方法（完整移植） ----------------------
-    def _preload_icons(self):
-        """预加载所有物品图片到缓存"""
+    def _init_icon_provider(self):
+        """初始化图标提供器（图标在列表行需要显示时才解码）"""
         if self.base_path is None:
             raise ValueError("程序资源路径未正确初始化")
         icon_dir = os.path.join(self.base_path, "res", "minecraft_icons")
-        default_icon_path = os.path.join(icon_dir, "ItemSprite_default.png")
-        # 预加载默认图标
-        try:
-            if os.path.exists(default_icon_path):
-                img = Image.open(default_icon_path).resize((32, 32), Image.Resampling.LANCZOS)
-                self.default_icon = ImageTk.PhotoImage(img)
-                self.icon_photo_refs["default"] = self.default_icon  # 保存引用
-            else:
-                # 创建透明默认图标
-                self.default_icon = ImageTk.PhotoImage(Image.new("RGBA", (32, 32), (0, 0, 0, 0)))
-                self.icon_photo_refs["default"] = self.default_icon  # 保存引用
-        except Exception as e:
-            print(f"预加载默认图标失败: {e}")
-            self.default_icon = ImageTk.PhotoImage(Image.new("RGBA", (32, 32), (0, 0, 0, 0)))
-            self.icon_photo_refs["default"] = self.default_icon  # 保存引用
-        # 预加载所有物品图标
-        for item in self.items_data:
-            item_id = item["ID"]
-            try:
-                icon_path = os.path.join(icon_dir, f"ItemSprite_{item_id}.png")
-                if os.path.exists(icon_path):
-                    img = Image.open(icon_path).resize((32, 32), Image.Resampling.LANCZOS)
-                    photo = ImageTk.PhotoImage(img)
-                    self.icon_cache[item_id] = photo
-                    self.icon_photo_refs[item_id] = photo  # 保存引用防止被回收
-                else:
-                    # 不存在时使用默认图标
-                    self.icon_cache[item_id] = self.default_icon
-            except Exception as e:
-                print(f"预加载图标 {item_id} 失败: {e}")
-                self.icon_cache[item_id] = self.default_icon
+        self.icon_provider = IconProvider(
+            self.root,
+            icon_dir,
+            max_cached=self.icon_cache_size,
+            atlas=self._load_icon_atlas(),
+            disk_cache=IconDiskCache(os.path.join(user_cache_dir(), "icons"))
+        )
+        self.default_icon = self.icon_provider.default_icon
+
+    def _load_icon_atlas(self):
+        """加载打包时生成的图标图集（res/icon_atlas.png + 索引），不存在时逐个读取PNG"""
+        if self.resources is not None:
+            return IconAtlas.load_archive(self.resources)
+        return IconAtlas.load(os.path.join(self.base_path, "res"))
 
     def _filter_items(self, event=None):
         """带防抖的过滤方法"""
@@ -506,14 +651,20 @@ class MainWindow:
             )
 
     def _load_items_json(self):
-        """加载res/Items_ZH.json物品ID-名称对应表"""
+        """
+        加载res/Items_ZH.json物品ID-名称对应表
+        优先使用编译好的二进制物品目录（内存映射，按下标取物品），过期或缺失时解析JSON并重新编译
+        """
         if self.base_path is None:
             raise ValueError("程序资源路径未正确初始化")
         items_path = os.path.join(self.base_path, "res", "Items_ZH.json")
         try:
-            with open(items_path, "r", encoding="utf-8") as f:
-                raw_data = json.load(f)
-                return [item for item in raw_data if item.get("ID") and item.get("Name")]
+            return load_item_catalog(
+                "Items_ZH.json",
+                resources=self.resources,
+                res_dir=os.path.join(self.base_path, "res"),
+                cache_dir=os.path.join(user_cache_dir(), "catalog")
+            )
         except FileNotFoundError:
             messagebox.showerror("错误", f"未找到物品配置文件：\n{items_path}")
             return []
@@ -535,7 +686,7 @@ class MainWindow:
         # 搜索框
         search_frame = ttk.Frame(self.selector_win)
         search_frame.pack(fill=tk.X, padx=10, pady=5)
-        ttk.Label(search_frame, text="搜索（名称/ID）：").pack(side=tk.LEFT, padx=5)
+        ttk.Label(search_frame, text="搜索（名称/ID/拼音）：").pack(side=tk.LEFT, padx=5)
         self.search_entry = ttk.Entry(search_frame, width=60)
         self.search_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
         self.search_entry.focus()
@@ -544,27 +695,40 @@ class MainWindow:
         # 物品列表（带图标#0列）
         list_frame = ttk.Frame(self.selector_win)
         list_frame.pack(fill=tk.BOTH, padx=10, pady=5, expand=True)
-        
-        v_scroll = ttk.Scrollbar(list_frame, orient=tk.VERTICAL)
-        v_scroll.pack(side=tk.RIGHT, fill=tk.Y)
 
         style = ttk.Style()
         style.configure("Treeview", rowheight=36)
         
-        self.item_tree = ttk.Treeview(
-            list_frame,
-            columns=("info"),
-            show="headings tree",  # 显示#0图标列和info内容列
-            yscrollcommand=v_scroll.set,
-            selectmode="browse"
-        )
+        if len(self.items_data) > self.virtual_list_threshold:
+            # 大型物品表：只为可视区域创建行，由虚拟列表自带的滚动条驱动
+            self.item_list = VirtualTreeview(
+                list_frame,
+                self._render_virtual_item_row,
+                row_height=36,
+                columns=("info"),
+                show="headings tree",
+                selectmode="browse"
+            )
+            self.item_list.frame.pack(fill=tk.BOTH, expand=True)
+            self.item_tree = self.item_list.tree
+        else:
+            self.item_list = None
+            v_scroll = ttk.Scrollbar(list_frame, orient=tk.VERTICAL)
+            v_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+            self.item_tree = ttk.Treeview(
+                list_frame,
+                columns=("info"),
+                show="headings tree",  # 显示#0图标列和info内容列
+                yscrollcommand=lambda first, last: self._on_item_tree_yscroll(v_scroll, first, last),
+                selectmode="browse"
+            )
+            self.item_tree.pack(fill=tk.BOTH, expand=True)
+            v_scroll.config(command=self.item_tree.yview)
         
         self.item_tree.heading("#0", text="")  # 图标列无标题
         self.item_tree.heading("info", text="物品名称（ID）", anchor=tk.W)
         self.item_tree.column("#0", width=60, minwidth=60, stretch=False)  # 图标列宽度
         self.item_tree.column("info", width=550, minwidth=200)
-        self.item_tree.pack(fill=tk.BOTH, expand=True)
-        v_scroll.config(command=self.item_tree.yview)
 
         # 确认按钮
         confirm_btn = ttk.Button(
@@ -576,17 +740,22 @@ class MainWindow:
 
         # 窗口关闭事件（清理引用）
         def on_close():
-            self.icon_photo_refs.clear()
             self.selector_win.destroy()
             self.selector_win = None
         self.selector_win.protocol("WM_DELETE_WINDOW", on_close)
 
-        # 初始加载所有物品
+        # 初始加载所有物品（普通模式下每个物品只创建一行）
+        if self.item_list is None:
+            self._create_item_rows()
         self._load_items_to_tree()
 
         # 双击物品直接确认选择
         self.item_tree.bind("<Double-1>", lambda e: self._confirm_item_selection())
 
+        # 虚拟列表自行处理滚轮事件
+        if self.item_list is not None:
+            return
+
         # ---------------------- 新增：阻止滚动事件冒泡 ----------------------
         # 为物品选择弹窗的Treeview绑定滚动事件
         self.item_tree.bind("<MouseWheel>", self._on_selector_scroll)
@@ -597,6 +766,66 @@ class MainWindow:
         v_scroll.bind("<Button-4>", self._on_selector_scroll)
         v_scroll.bind("<Button-5>", self._on_selector_scroll)
 
+    def _on_item_tree_yscroll(self, v_scroll, first, last):
+        """物品列表滚动时同步滚动条，并延迟刷新可见行图标"""
+        v_scroll.set(first, last)
+        self._schedule_icon_refresh()
+
+    def _schedule_icon_refresh(self):
+        """合并同一轮事件中的多次刷新请求"""
+        if not self.selector_win:
+            return
+        if self.icon_refresh_id:
+            self.root.after_cancel(self.icon_refresh_id)
+        self.icon_refresh_id = self.root.after_idle(self._refresh_visible_item_icons)
+
+    def _refresh_visible_item_icons(self):
+        """仅为当前可见的物品行加载图标"""
+        self.icon_refresh_id = None
+        if not self.selector_win or self.item_list is not None:
+            return
+        children = self.item_tree.get_children()
+        if not children:
+            return
+        first, last = self.item_tree.yview()
+        start = max(int(first * len(children)) - 1, 0)
+        end = min(int(last * len(children)) + 2, len(children))
+        for tree_id in children[start:end]:
+            item_id = self.item_tree.item(tree_id, "tags")[0].split(":")[-1]
+            photo = self.icon_provider.request(
+                item_id,
+                lambda photo, row=tree_id: self._set_tree_row_icon(self.item_tree, row, photo)
+            )
+            self.item_tree.item(tree_id, image=photo)
+
+    def _render_virtual_item_row(self, idx, row_id):
+        """虚拟列表行渲染：返回物品下标idx对应的行内容"""
+        item = self.items_data[idx]
+        full_item_id = f"minecraft:{item['ID']}"
+        photo = self.icon_provider.request(
+            item["ID"],
+            lambda photo: self._set_virtual_row_icon(row_id, idx, photo)
+        )
+        return {
+            "image": photo,
+            "text": "",
+            "values": (f"{item['Name']}({full_item_id})",),
+            "tags": (full_item_id,)
+        }
+
+    def _set_virtual_row_icon(self, row_id, idx, photo):
+        """图标解码完成时，行可能已被复用显示其他物品，需先核对"""
+        if self.item_list is not None and self.item_list.row_key(row_id) == idx:
+            self._set_tree_row_icon(self.item_tree, row_id, photo)
+
+    def _set_tree_row_icon(self, tree, tree_id, photo):
+        """后台解码完成后回填行图标（行或窗口可能已被删除）"""
+        try:
+            if tree.exists(tree_id):
+                tree.item(tree_id, image=photo)
+        except tk.TclError:
+            pass
+
     def _on_selector_scroll(self, event):
         """
         物品选择弹窗的滚动事件处理函数
@@ -623,47 +852,62 @@ class MainWindow:
         else:
             # 开发时：资源在当前脚本所在目录的res文件夹下
             self.base_path = os.path.dirname(__file__)
+        # 打包时资源合并为一个不压缩的zip，通过内存映射按需读取，无需逐个文件解包
+        self.resources = ResourceArchive.open(os.path.join(self.base_path, RESOURCE_ARCHIVE_NAME))
 
-    def _load_items_to_tree(self, filter_text=""):
-        """加载物品到Treeview（带图标）"""
-        for item in self.item_tree.get_children():
-            self.item_tree.delete(item)
-        
-        for item in self.items_data:
-            item_id = item["ID"]
-            item_name = item["Name"]
-            full_item_id = f"minecraft:{item_id}"
-
-            # 过滤逻辑：匹配名称或ID
-            if filter_text and not (
-                filter_text.lower() in item_name.lower() or
-                filter_text.lower() in item_id.lower()
-            ):
-                continue
-
-            # 获取预缓存的图标
-            photo = self.icon_cache.get(item_id, self.default_icon)
-            info_text = f"{item_name}({full_item_id})"
+    def _create_item_rows(self):
+        """为每个物品创建一次固定的行，之后过滤只调整行的挂载与顺序"""
+        self.item_row_ids = []
+        for idx, item in enumerate(self.items_data):
+            full_item_id = f"minecraft:{item['ID']}"
+            info_text = f"{item['Name']}({full_item_id})"
             
-            # 插入Treeview：#0列显示图标，info列显示名称和ID
-            self.item_tree.insert(
+            # 插入Treeview：#0列先显示默认图标，滚动到可见区域时再加载实际图标
+            self.item_row_ids.append(self.item_tree.insert(
                 "", tk.END,
-                image=photo,    # #0列图标
+                iid=f"item{idx}",
+                image=self.default_icon,    # #0列图标
                 text="",        # #0列文本留空
                 values=(info_text,),  # info列内容
                 tags=(full_item_id,)  # 存储完整物品ID用于后续选择
-            )
+            ))
+
+    def _load_items_to_tree(self, filter_text=""):
+        """按过滤结果更新Treeview：只分离/重新挂载可见性或位置变化的行"""
+        # 通过索引过滤并排序：完全匹配ID > 前缀匹配 > 子串匹配
+        indices = self.search_index.search_indices(filter_text)
+        if self.item_list is not None:
+            self.item_list.set_keys(indices)
+            return
+        wanted = [self.item_row_ids[idx] for idx in indices]
+        wanted_set = set(wanted)
+        
+        # 分离不再匹配的行
+        current = list(self.item_tree.get_children())
+        hidden = [row for row in current if row not in wanted_set]
+        if hidden:
+            self.item_tree.detach(*hidden)
+            current = [row for row in current if row in wanted_set]
+        
+        # 按新顺序逐位比对，仅移动位置不对的行（新匹配的行会被重新挂载）
+        for pos, row in enumerate(wanted):
+            if pos < len(current) and current[pos] == row:
+                continue
+            self.item_tree.move(row, "", pos)
+            try:
+                current.remove(row)
+            except ValueError:
+                pass
+            current.insert(pos, row)
+        self._schedule_icon_refresh()
 
     def _confirm_item_selection(self):
         """确认选择，将物品ID填入目标输入框"""
-        selected_items = self.item_tree.selection()
-        if not selected_items:
+        selected_item_id = self._selected_item_id()
+        if selected_item_id is None:
             messagebox.showwarning("提示", "请先选择一个物品！")
             return
 
-        # 获取选中项的完整物品ID
-        selected_item_id = self.item_tree.item(selected_items[0], "tags")[0]
-
         # 根据目标输入框填充ID
         if self.selector_target == "buy":
             self.buy_id.delete(0, tk.END)
@@ -679,103 +923,242 @@ class MainWindow:
         self.selector_win.destroy()
         self.selector_win = None
 
+    def _selected_item_id(self):
+        """
+        返回选择器中选中物品的完整ID，未选中时返回None
+        虚拟列表的选中项滚出可视区域后Treeview中不再有选中行，按数据键读取
+        """
+        if self.item_list is not None:
+            key = self.item_list.selected_key
+            if key is None:
+                return None
+            return f"minecraft:{self.items_data[key]['ID']}"
+        selected_items = self.item_tree.selection()
+        if not selected_items:
+            return None
+        return self.item_tree.item(selected_items[0], "tags")[0]
+
     # ---------------------- 交易项管理相关方法 ----------------------
     def update_trade_listbox(self):
-        """更新交易项列表（带图标多列展示）"""
+        """重建交易项列表（带图标多列展示），仅用于整体替换交易项时"""
         # 保存滚动位置和选中状态
         scroll_pos = self.trade_listbox.yview()[0]
         h_scroll_pos = self.trade_listbox.xview()[0]
-        selected_ids = self.trade_listbox.selection()
+        # 整体替换后交易项ID全部更新，按行位置恢复选中
+        selected_indices = [self.trade_listbox.index(tree_id) for tree_id in self.trade_listbox.selection()]
 
         # 清空现有数据
-        for item in self.trade_listbox.get_children():
-            self.trade_listbox.delete(item)
-        self.original_bg.clear()
+        self.trade_listbox.delete(*self.trade_listbox.get_children())
+        self.row_trade_ids.clear()
+        self.current_hover_item = None
 
         # 遍历交易项并添加到Treeview
-        for idx, trade in enumerate(self.trade_manager.trades):
-            # 解析Buy方物品
-            buy_id_full = trade["buy_id"]
-            _, buy_nbt = self.nbt_handler.parse_item_with_nbt(buy_id_full)
-            buy_id_simple = self.nbt_handler.simplify_item_id(buy_id_full)
-            buy_hash = self.nbt_handler.get_nbt_hash(buy_nbt)
-            buy_item_id = buy_id_simple.split(":")[-1] if ":" in buy_id_simple else buy_id_simple
-            buy_photo = self.icon_cache.get(buy_item_id, self.default_icon)
-            buy_item_text = buy_id_simple + (f" [NBT: {buy_hash}]" if buy_nbt else "")
-            
-            # 解析Buy2方物品
-            buy2_id_full = trade.get("buy2_id", "minecraft:air")
-            _, buy2_nbt = self.nbt_handler.parse_item_with_nbt(buy2_id_full)
-            buy2_id_simple = self.nbt_handler.simplify_item_id(buy2_id_full)
-            buy2_hash = self.nbt_handler.get_nbt_hash(buy2_nbt)
-            buy2_item_id = buy2_id_simple.split(":")[-1] if ":" in buy2_id_simple else buy2_id_simple
-            buy2_photo = self.icon_cache.get(buy2_item_id, self.default_icon)
-            buy2_show = buy2_id_simple != "minecraft:air" or trade.get("buy2_count", "1") != "1"
-            buy2_item_text = (buy2_id_simple + (f" [NBT: {buy2_hash}]" if buy2_nbt else "")) if buy2_show else ""
-            buy2_count = trade.get("buy2_count", "1") if buy2_show else ""
-            
-            # 解析Sell方物品
-            sell_id_full = trade["sell_id"]
-            _, sell_nbt = self.nbt_handler.parse_item_with_nbt(sell_id_full)
-            sell_id_simple = self.nbt_handler.simplify_item_id(sell_id_full)
-            sell_hash = self.nbt_handler.get_nbt_hash(sell_nbt)
-            sell_item_id = sell_id_simple.split(":")[-1] if ":" in sell_id_simple else sell_id_simple
-            sell_photo = self.icon_cache.get(sell_item_id, self.default_icon)
-            sell_item_text = sell_id_simple + (f" [NBT: {sell_hash}]" if sell_nbt else "")
-            
-            # 设置行背景色（交替色）
-            bg_color = "#e8f8e8" if (trade["trade_type"] == "emerald_buy" and idx % 2 == 0) else \
-                    "#d8e8d8" if trade["trade_type"] == "emerald_buy" else \
-                    "#f8e8f8" if idx % 2 == 0 else "#e8d8e8"
-            
-            # 插入Treeview行 - 修复：使用image参数仅设置#0列图标
-            tree_item_id = self.trade_listbox.insert(
-                "", tk.END,
-                image=buy_photo,  # 仅为#0列设置图标
-                values=(
-                    "",  # buy_icon列
-                    buy_item_text,
-                    trade["buy_count"],
-                    "",  # buy2_icon列
-                    buy2_item_text,
-                    buy2_count,
-                    "→",  # 箭头符号
-                    "",  # sell_icon列
-                    sell_item_text,
-                    trade["sell_count"],
-                    trade["max_uses"]
-                ),
-                tags=(str(idx),)
-            )
-            
-            # 为其他列设置图标 - 修复：使用set方法而不是item方法
-            self.trade_listbox.set(tree_item_id, "buy2_icon", "")
-            self.trade_listbox.set(tree_item_id, "sell_icon", "")
-            
-            # 使用标签样式为不同列设置图标
-            self.trade_listbox.tag_configure(f"buy2_{tree_item_id}", image=buy2_photo)
-            self.trade_listbox.tag_configure(f"sell_{tree_item_id}", image=sell_photo)
-            self.trade_listbox.item(tree_item_id, tags=(str(idx), f"buy2_{tree_item_id}", f"sell_{tree_item_id}"))
-            
-            # 保存原始背景色并应用
-            self.original_bg[tree_item_id] = bg_color
-            self.trade_listbox.tag_configure(str(idx), background=bg_color)
+        for idx in range(len(self.trade_manager.trades)):
+            self._insert_trade_row(idx)
         
         # 恢复选中状态
-        for tree_id in selected_ids:
-            try:
-                original_idx = self.trade_listbox.item(tree_id, "tags")[0]
-                for new_tree_id in self.trade_listbox.get_children():
-                    if self.trade_listbox.item(new_tree_id, "tags")[0] == original_idx:
-                        self.trade_listbox.selection_add(new_tree_id)
-                        break
-            except Exception:
-                continue
+        trade_ids = self.trade_manager.trade_ids
+        self.trade_listbox.selection_set(
+            [self._trade_row(trade_ids[idx]) for idx in selected_indices if idx < len(trade_ids)]
+        )
         
         # 恢复滚动位置
         self.trade_listbox.yview_moveto(scroll_pos)
         self.trade_listbox.xview_moveto(h_scroll_pos)
 
+    def _on_trades_changed(self, event, *args):
+        """根据TradeManager的变更事件，只修补受影响的列表行"""
+        # 行内容或位置变化后，下次鼠标移动时重新处理悬停
+        self.hover_cell = None
+        if self.canvas_trade_table:
+            self._sync_trade_table(event, *args)
+            return
+        if event == "reset":
+            self.update_trade_listbox()
+            return
+        
+        trade_ids = self.trade_manager.trade_ids
+        if event == "insert":
+            index, count = args
+            for offset in range(count):
+                self._insert_trade_row(index + offset)
+            # 插入点之后的行序号和隔行底色发生变化
+            self._restyle_trade_rows(index + count)
+        elif event == "update":
+            index, = args
+            row = self._trade_row(trade_ids[index])
+            self._render_trade_row(row, index)
+            self._style_trade_row(row, index)
+        elif event == "delete":
+            indices, ids = args
+            deleted = [self._trade_row(trade_id) for trade_id in ids]
+            self.trade_listbox.delete(*deleted)
+            for tree_id in deleted:
+                self.row_trade_ids.pop(tree_id, None)
+                if tree_id == self.current_hover_item:
+                    self.current_hover_item = None
+            self._restyle_trade_rows(indices[0])
+        elif event == "swap":
+            first, second = sorted(args)
+            # 交易项ID已随交易项互换：原前一行现在对应second，原后一行对应first
+            first_row, second_row = self._trade_row(trade_ids[second]), self._trade_row(trade_ids[first])
+            # 先把前一行移到后一位置，后一行随之前移一位，再把它移到前一位置
+            self.trade_listbox.move(first_row, "", second)
+            self.trade_listbox.move(second_row, "", first)
+            self._style_trade_row(second_row, first)
+            self._style_trade_row(first_row, second)
+        elif event == "move":
+            start, stop = args
+            # 依次把每个位置的行移到位，范围外的行不受影响
+            for idx in range(start, stop):
+                self.trade_listbox.move(self._trade_row(trade_ids[idx]), "", idx)
+            self._restyle_trade_rows(start, stop)
+
+    def _sync_trade_table(self, event, *args):
+        """Canvas表格：同步行ID映射和行顺序，表格只重绘可视区域"""
+        trade_ids = self.trade_manager.trade_ids
+        if event == "update":
+            self.trade_listbox.schedule_redraw()
+            return
+        
+        selected_indices = None
+        if event == "reset":
+            # 整体替换后交易项ID全部更新，按行位置恢复选中
+            selected_indices = [self.trade_listbox.index(row) for row in self.trade_listbox.selection()]
+            self.row_trade_ids = {self._trade_row(trade_id): trade_id for trade_id in trade_ids}
+            self.current_hover_item = None
+        elif event == "insert":
+            index, count = args
+            for trade_id in trade_ids[index:index + count]:
+                self.row_trade_ids[self._trade_row(trade_id)] = trade_id
+        elif event == "delete":
+            for trade_id in args[1]:
+                row = self._trade_row(trade_id)
+                self.row_trade_ids.pop(row, None)
+                if row == self.current_hover_item:
+                    self.current_hover_item = None
+        
+        self.trade_listbox.set_keys([self._trade_row(trade_id) for trade_id in trade_ids])
+        if selected_indices is not None:
+            self.trade_listbox.selection_set(
+                [self._trade_row(trade_ids[idx]) for idx in selected_indices if idx < len(trade_ids)]
+            )
+
+    def _trade_table_row(self, row, idx):
+        """Canvas表格：返回第idx行的 (背景色, 各列的 (文本, 图标))，三个物品列都显示图标"""
+        trade = self.trade_manager.trades[idx]
+        
+        def icon(item_id):
+            # 未缓存的图标先显示默认图标，加载完成后重绘表格
+            return self.icon_provider.request(item_id, self.trade_listbox.schedule_redraw)
+        
+        buy_item_text, buy_item_id = self._trade_item_display(trade.buy_item)
+        sell_item_text, sell_item_id = self._trade_item_display(trade.sell_item)
+        if trade.has_buy2:
+            buy2_item_text, buy2_item_id = self._trade_item_display(trade.buy2_item)
+            buy2_cells = [("", icon(buy2_item_id)), (buy2_item_text, None), (str(trade.buy2_count), None)]
+        else:
+            buy2_cells = [("", None), ("", None), ("", None)]
+        
+        background = HOVER_BG if row == self.current_hover_item else TRADE_ROW_STYLES[self._row_style_tag(idx)]
+        return background, [
+            ("", icon(buy_item_id)),
+            (buy_item_text, None),
+            (str(trade.buy_count), None),
+            *buy2_cells,
+            ("→", None),
+            ("", icon(sell_item_id)),
+            (sell_item_text, None),
+            (str(trade.sell_count), None),
+            (str(trade.max_uses), None),
+        ]
+
+    @staticmethod
+    def _trade_row(trade_id):
+        """交易项ID对应的Treeview行ID"""
+        return f"trade_{trade_id}"
+
+    def _row_trade_index(self, tree_item):
+        """Treeview行对应交易项的当前索引，不是交易项行时返回None"""
+        trade_id = self.row_trade_ids.get(tree_item)
+        return None if trade_id is None else self.trade_manager.index_of(trade_id)
+
+    def _trade_item_display(self, item):
+        """由交易项中已解析的 (物品ID, NBT标签) 返回 (显示文本, 图标物品ID)"""
+        item_id, nbt = item
+        id_simple = self.nbt_handler.simplify_item_id(item_id)
+        nbt_hash = self.nbt_handler.get_nbt_hash(nbt)
+        icon_id = id_simple.split(":")[-1] if ":" in id_simple else id_simple
+        return id_simple + (f" [NBT: {nbt_hash}]" if nbt else ""), icon_id
+
+    def _insert_trade_row(self, idx):
+        """在列表第idx行插入交易项"""
+        trade_id = self.trade_manager.trade_ids[idx]
+        tree_item_id = self.trade_listbox.insert(
+            "", idx, iid=self._trade_row(trade_id), tags=(self._row_style_tag(idx),)
+        )
+        self.row_trade_ids[tree_item_id] = trade_id
+        self._render_trade_row(tree_item_id, idx)
+        return tree_item_id
+
+    def _render_trade_row(self, tree_item_id, idx):
+        """
+        按交易项内容填充行的各列
+        Treeview只能在#0列显示图标，而交易列表隐藏了#0列，因此不加载图标（图标只在Canvas表格中显示）
+        """
+        trade = self.trade_manager.trades[idx]
+        
+        # 解析Buy方物品
+        buy_item_text, _ = self._trade_item_display(trade.buy_item)
+        
+        # 解析Buy2方物品
+        buy2_item_text, _ = self._trade_item_display(trade.buy2_item)
+        buy2_show = trade.has_buy2
+        buy2_item_text = buy2_item_text if buy2_show else ""
+        buy2_count = trade.buy2_count if buy2_show else ""
+        
+        # 解析Sell方物品
+        sell_item_text, _ = self._trade_item_display(trade.sell_item)
+        
+        self.trade_listbox.item(tree_item_id, values=(
+            "",  # buy_icon列
+            buy_item_text,
+            trade.buy_count,
+            "",  # buy2_icon列
+            buy2_item_text,
+            buy2_count,
+            "→",  # 箭头符号
+            "",  # sell_icon列
+            sell_item_text,
+            trade.sell_count,
+            trade.max_uses
+        ))
+
+    def _row_style_tag(self, idx):
+        """第idx行的样式标签（按交易类型和奇偶行交替底色）"""
+        trade = self.trade_manager.trades[idx]
+        return f"{trade.trade_type}_{'even' if idx % 2 == 0 else 'odd'}"
+
+    def _style_trade_row(self, tree_item_id, idx):
+        """
+        更新行的样式标签（交替色或悬停色），只在共用标签之间切换；
+        样式标签固定放在第一位，悬停时用悬停标签替换，不叠加多个背景色标签
+        """
+        if self.canvas_trade_table:
+            # Canvas表格绘制时按行位置和悬停状态取背景色
+            self.trade_listbox.schedule_redraw()
+            return
+        tags = list(self.trade_listbox.item(tree_item_id, "tags"))
+        style_tag = HOVER_TAG if tree_item_id == self.current_hover_item else self._row_style_tag(idx)
+        if tags[0] != style_tag:
+            tags[0] = style_tag
+            self.trade_listbox.item(tree_item_id, tags=tags)
+
+    def _restyle_trade_rows(self, start, stop=None):
+        """为第start行到stop行（不含，默认到末尾）重新编号并刷新背景色（不重新解析物品）"""
+        trade_ids = self.trade_manager.trade_ids
+        for idx in range(start, len(trade_ids) if stop is None else stop):
+            self._style_trade_row(self._trade_row(trade_ids[idx]), idx)
 
     def swap_buy_sell_on_trade_type_switch(self):
         """切换交易类型时处理物品ID"""
@@ -816,8 +1199,9 @@ class MainWindow:
             # 模拟左键单击取消多选
             self.trade_listbox.event_generate("<Button-1>", x=event.x, y=event.y)
             self.trade_listbox.event_generate("<ButtonRelease-1>", x=event.x, y=event.y)
-            click_idx = int(self.trade_listbox.item(tree_item, "tags")[0])
-        except (IndexError, ValueError):
+        except tk.TclError:
+            return
+        if self._row_trade_index(tree_item) is None:
             return
         
         # 单选时显示菜单
@@ -830,36 +1214,35 @@ class MainWindow:
         if len(selected_items) != 1:
             return
         
-        try:
-            idx = int(self.trade_listbox.item(selected_items[0], "tags")[0])
-        except (IndexError, ValueError):
+        idx = self._row_trade_index(selected_items[0])
+        if idx is None:
             return
         
         trade = self.trade_manager.trades[idx]
         
         # 填充表单
         self.buy_id.delete(0, tk.END)
-        self.buy_id.insert(0, trade["buy_id"])
+        self.buy_id.insert(0, trade.buy_id)
         self.buy_count.delete(0, tk.END)
-        self.buy_count.insert(0, trade["buy_count"])
+        self.buy_count.insert(0, str(trade.buy_count))
         self.buy2_id.delete(0, tk.END)
-        self.buy2_id.insert(0, trade.get("buy2_id", "minecraft:air"))
+        self.buy2_id.insert(0, trade.buy2_id)
         self.buy2_count.delete(0, tk.END)
-        self.buy2_count.insert(0, trade.get("buy2_count", "1"))
+        self.buy2_count.insert(0, str(trade.buy2_count))
         self.sell_id.delete(0, tk.END)
-        self.sell_id.insert(0, trade["sell_id"])
+        self.sell_id.insert(0, trade.sell_id)
         self.sell_count.delete(0, tk.END)
-        self.sell_count.insert(0, trade["sell_count"])
+        self.sell_count.insert(0, str(trade.sell_count))
         self.max_uses.delete(0, tk.END)
-        self.max_uses.insert(0, trade["max_uses"])
+        self.max_uses.insert(0, str(trade.max_uses))
         
-        self.selected_edit_idx = idx
+        self.selected_edit_id = self.trade_manager.trade_ids[idx]
         self.add_modify_btn.config(text="修改交易项")
         self.cancel_edit_btn.grid()
 
     def cancel_edit(self):
         """取消修改"""
-        self.selected_edit_idx = None
+        self.selected_edit_id = None
         self.add_modify_btn.config(text="添加交易项")
         self.cancel_edit_btn.grid_remove()
         # 重置编辑框
@@ -895,47 +1278,42 @@ class MainWindow:
             messagebox.showerror("错误", "所有输入框不能为空！")
             return
         
-        # 验证数量为正整数
+        # 验证数量为整数
         try:
-            if int(buy_count) <= 0 or int(buy2_count) <= 0 or int(sell_count) <= 0 or int(max_uses) <= 0:
-                messagebox.showerror("错误", "数量和maxUses必须大于0！")
-                return
+            buy_count, buy2_count, sell_count, max_uses = (
+                int(value) for value in (buy_count, buy2_count, sell_count, max_uses)
+            )
         except ValueError:
             messagebox.showerror("错误", "数量和maxUses必须是正整数！")
             return
         
-        # 验证物品格式
+        # 构建交易项（同时校验数量大于0和物品格式）
         try:
-            self.nbt_handler.parse_item_with_nbt(buy_id_input)
-            self.nbt_handler.parse_item_with_nbt(buy2_id_input)
-            self.nbt_handler.parse_item_with_nbt(sell_id_input)
+            new_trade = Trade(
+                buy_id=buy_id_input,
+                buy_count=buy_count,
+                sell_id=sell_id_input,
+                sell_count=sell_count,
+                max_uses=max_uses,
+                trade_type=self.trade_type_var.get(),
+                buy2_id=buy2_id_input,
+                buy2_count=buy2_count
+            )
         except ValueError as e:
-            messagebox.showerror("物品格式错误", str(e))
+            messagebox.showerror("错误", str(e))
             return
         
-        # 构建交易项
-        new_trade = {
-            "buy_id": buy_id_input,
-            "buy_count": buy_count,
-            "buy2_id": buy2_id_input,
-            "buy2_count": buy2_count,
-            "sell_id": sell_id_input,
-            "sell_count": sell_count,
-            "max_uses": max_uses,
-            "trade_type": self.trade_type_var.get()
-        }
-        
-        # 新增/修改逻辑
-        if self.selected_edit_idx is None:
+        # 新增/修改逻辑（按ID定位正在编辑的交易项，期间移动或删除其他项不影响）
+        edit_idx = None if self.selected_edit_id is None else self.trade_manager.index_of(self.selected_edit_id)
+        if edit_idx is None:
             self.trade_manager.add_trade(new_trade)
         else:
-            self.trade_manager.update_trade(self.selected_edit_idx, new_trade)
+            self.trade_manager.update_trade(edit_idx, new_trade)
             messagebox.showinfo("成功", "交易项已修改！")
             self.cancel_edit()
         
-        # 更新列表
-        self.update_trade_listbox()
-        if self.selected_edit_idx is None:
+        # 列表由变更事件自动更新
+        if edit_idx is None:
             # 新增后重置编辑框
             self.buy_id.delete(0, tk.END)
             self.buy_id.insert(0, "minecraft:emerald")
@@ -959,86 +1337,108 @@ class MainWindow:
             messagebox.showwarning("提示", "请选中要删除的交易项！")
             return
         
-        # 获取选中项的索引（逆序删除）
-        selected_indices = []
-        for tree_id in selected_items:
-            try:
-                idx = int(self.trade_listbox.item(tree_id, "tags")[0])
-                selected_indices.append(idx)
-            except (IndexError, ValueError):
-                continue
+        # 获取选中项的交易项ID和索引
+        selected_ids = [self.row_trade_ids[tree_id] for tree_id in selected_items if tree_id in self.row_trade_ids]
+        selected_indices = [self.trade_manager.index_of(trade_id) for trade_id in selected_ids]
         
         # 取消正在编辑的项
-        if self.selected_edit_idx in selected_indices:
+        if self.selected_edit_id in selected_ids:
             self.cancel_edit()
         
         # 删除交易项
-        self.trade_manager.delete_trades(sorted(selected_indices, reverse=True))
-        self.update_trade_listbox()
+        self.trade_manager.delete_trades(selected_indices)
 
-    def move_trade_up(self):
-        """上移交易项"""
+    def _selected_trade_indices(self):
+        """返回选中行对应的交易项索引"""
+        return [
+            self.trade_manager.index_of(self.row_trade_ids[tree_id])
+            for tree_id in self.trade_listbox.selection() if tree_id in self.row_trade_ids
+        ]
+
+    def _move_selected_trades(self, move, *args):
+        """对选中的交易项执行TradeManager的块移动操作，行ID不变，移动后选中状态保持"""
         selected_items = self.trade_listbox.selection()
-        if len(selected_items) != 1:
-            messagebox.showwarning("提示", "请仅选中1个交易项上移！")
+        if not selected_items:
+            messagebox.showwarning("提示", "请选中要移动的交易项！")
             return
-        
-        try:
-            idx = int(self.trade_listbox.item(selected_items[0], "tags")[0])
-        except (IndexError, ValueError):
+        move(self._selected_trade_indices(), *args)
+        self.trade_listbox.selection_set(selected_items)
+        self.trade_listbox.see(selected_items[0])
+
+    def move_trade_up(self):
+        """上移交易项（支持多选）"""
+        self._move_selected_trades(self.trade_manager.move_trades, -1)
+
+    def move_trade_down(self):
+        """下移交易项（支持多选）"""
+        self._move_selected_trades(self.trade_manager.move_trades, 1)
+
+    def move_trades_to_top(self):
+        """置顶选中的交易项"""
+        self._move_selected_trades(self.trade_manager.move_trades_to, 0)
+
+    def move_trades_to_bottom(self):
+        """置底选中的交易项"""
+        self._move_selected_trades(self.trade_manager.move_trades_to, len(self.trade_manager.trades))
+
+    def _on_trade_drag_start(self, event):
+        """按下鼠标：在已选中的行上按下时记录被拖动的交易项（在Treeview默认的单选处理之前执行）"""
+        self.drag_trade_ids = None
+        tree_item = self.trade_listbox.identify_row(event.y)
+        # 按住Shift/Ctrl时为多选操作，不拖动
+        if not tree_item or event.state & 0x0005:
             return
-        
-        if idx <= 0:
+        selection = self.trade_listbox.selection()
+        dragged = selection if tree_item in selection else (tree_item,)
+        self.drag_trade_ids = [self.row_trade_ids[row] for row in dragged if row in self.row_trade_ids]
+
+    def _on_trade_drag_motion(self, event):
+        """拖动中：保持被拖动的行选中，并提示目标位置"""
+        if not self.drag_trade_ids:
             return
-        
-        # 更新编辑索引
-        if self.selected_edit_idx == idx:
-            self.selected_edit_idx = idx - 1
-        elif self.selected_edit_idx == idx - 1:
-            self.selected_edit_idx = idx
-        
-        # 交换交易项并更新列表
-        self.trade_manager.swap_trades(idx, idx - 1)
-        self.update_trade_listbox()
-        
-        # 重新选中移动后的项
-        for tree_id in self.trade_listbox.get_children():
-            if self.trade_listbox.item(tree_id, "tags")[0] == str(idx - 1):
-                self.trade_listbox.selection_clear()
-                self.trade_listbox.selection_add(tree_id)
-                break
+        target = self.trade_listbox.identify_row(event.y)
+        self.trade_listbox.selection_set([self._trade_row(trade_id) for trade_id in self.drag_trade_ids])
+        self.trade_listbox.config(cursor="sb_v_double_arrow" if target else "")
+        if target:
+            self.trade_listbox.see(target)
+        return "break"
 
-    def move_trade_down(self):
-        """下移交易项"""
-        selected_items = self.trade_listbox.selection()
-        if len(selected_items) != 1:
-            messagebox.showwarning("提示", "请仅选中1个交易项下移！")
+    def _on_trade_drag_release(self, event):
+        """松开鼠标：把被拖动的交易项放到目标行处（向下拖放到其后，向上拖放到其前）"""
+        dragged, self.drag_trade_ids = self.drag_trade_ids, None
+        self.trade_listbox.config(cursor="")
+        target = self.trade_listbox.identify_row(event.y)
+        target_idx = self._row_trade_index(target)
+        if not dragged or target_idx is None:
             return
-        
-        try:
-            idx = int(self.trade_listbox.item(selected_items[0], "tags")[0])
-        except (IndexError, ValueError):
+        indices = [self.trade_manager.index_of(trade_id) for trade_id in dragged]
+        if target_idx in indices:
             return
-        
-        if idx >= len(self.trade_manager.trades) - 1:
+        before = target_idx + 1 if target_idx > min(indices) else target_idx
+        self.trade_manager.move_trades_to(indices, before)
+        self.trade_listbox.selection_set([self._trade_row(trade_id) for trade_id in dragged])
+
+    def undo_trade_change(self):
+        """撤销上一步交易项修改（添加、修改、删除、移动、反转追加、加载配置）"""
+        self._step_history(self.trade_manager.undo)
+
+    def redo_trade_change(self):
+        """重做上一步撤销的交易项修改"""
+        self._step_history(self.trade_manager.redo)
+
+    def _step_history(self, step):
+        if not step():
+            self.root.bell()
             return
-        
-        # 更新编辑索引
-        if self.selected_edit_idx == idx:
-            self.selected_edit_idx = idx + 1
-        elif self.selected_edit_idx == idx + 1:
-            self.selected_edit_idx = idx
-        
-        # 交换交易项并更新列表
-        self.trade_manager.swap_trades(idx, idx + 1)
-        self.update_trade_listbox()
-        
-        # 重新选中移动后的项
-        for tree_id in self.trade_listbox.get_children():
-            if self.trade_listbox.item(tree_id, "tags")[0] == str(idx + 1):
-                self.trade_listbox.selection_clear()
-                self.trade_listbox.selection_add(tree_id)
-                break
+        # 正在编辑的交易项被撤销/重做删除时取消编辑
+        if self.selected_edit_id is not None and self.trade_manager.index_of(self.selected_edit_id) is None:
+            self.cancel_edit()
+
+    def _on_history_key(self, event, action):
+        if isinstance(event.widget, (tk.Entry, tk.Text)):
+            return
+        action()
+        return "break"
 
     def reverse_append_trades(self):
         """反转追加交易项"""
@@ -1048,7 +1448,6 @@ class MainWindow:
         
         reversed_trades = self.trade_manager.reverse_trades()
         self.trade_manager.add_trades(reversed_trades)
-        self.update_trade_listbox()
         messagebox.showinfo("成功", f"已反转{len(reversed_trades)}个交易项并追加！")
 
     # ---------------------- NBT悬停预览功能 ----------------------
@@ -1080,65 +1479,70 @@ class MainWindow:
             self.nbt_tooltip = None
 
     def on_treeview_motion(self, event):
-        """处理Treeview鼠标移动事件（悬停背景+NBT预览）"""
-        tree_item = self.trade_listbox.identify_row(event.y)
-        column = self.trade_listbox.identify_column(event.x)
+        """处理Treeview鼠标移动事件：只记录位置，每帧最多处理一次悬停"""
+        self.hover_pointer = (event.x, event.y, event.x_root, event.y_root)
+        if self.hover_job is None:
+            self.hover_job = self.root.after(HOVER_FRAME_MS, self._process_hover)
+
+    def _process_hover(self):
+        """
+        处理最近一次鼠标位置的悬停（悬停背景+NBT预览）
+        行和列都未变化时只让NBT浮窗跟随鼠标（避免鼠标移到浮窗上触发<Leave>而闪烁）
+        """
+        self.hover_job = None
+        x, y, x_root, y_root = self.hover_pointer
+        tree_item = self.trade_listbox.identify_row(y)
+        column = self.trade_listbox.identify_column(x)
+        if (tree_item, column) == self.hover_cell:
+            if self.nbt_tooltip:
+                self.nbt_tooltip.wm_geometry(f"+{x_root + 10}+{y_root + 10}")
+            return
+        self.hover_cell = (tree_item, column)
         
-        if not tree_item:
+        # 获取交易项索引并验证
+        idx = self._row_trade_index(tree_item) if tree_item else None
+        if idx is None:
             self.hide_nbt_tooltip()
             self.reset_hover_bg()
-            self.current_hover_item = None
             return
         
         # 处理悬停背景色
         if tree_item != self.current_hover_item:
             self.reset_hover_bg()
             self.current_hover_item = tree_item
-            self.trade_listbox.tag_configure("hover", background="#ffffcc")
-            self.trade_listbox.item(tree_item, tags=(*self.trade_listbox.item(tree_item, "tags"), "hover"))
-        
-        # 获取交易项索引并验证
-        try:
-            idx = int(self.trade_listbox.item(tree_item, "tags")[0])
-        except (IndexError, ValueError):
-            self.hide_nbt_tooltip()
-            return
-        
-        if idx < 0 or idx >= len(self.trade_manager.trades):
-            self.hide_nbt_tooltip()
-            return
+            self._style_trade_row(tree_item, idx)
         
         # 解析NBT内容（根据当前列）
         trade = self.trade_manager.trades[idx]
         nbt_content = None
         if column == "#2":  # buy_item列
-            _, nbt_content = self.nbt_handler.parse_item_with_nbt(trade["buy_id"])
+            _, nbt_content = trade.buy_item
         elif column == "#5":  # buy2_item列
-            _, nbt_content = self.nbt_handler.parse_item_with_nbt(trade.get("buy2_id", "minecraft:air"))
+            _, nbt_content = trade.buy2_item
         elif column == "#9":  # sell_item列
-            _, nbt_content = self.nbt_handler.parse_item_with_nbt(trade["sell_id"])
+            _, nbt_content = trade.sell_item
         
         # 显示NBT预览浮窗
         if nbt_content:
-            x = self.root.winfo_pointerx() + 10
-            y = self.root.winfo_pointery() + 10
-            self.show_nbt_tooltip(event, nbt_content, x, y)
+            self.show_nbt_tooltip(None, nbt_content, x_root + 10, y_root + 10)
         else:
             self.hide_nbt_tooltip()
 
     def on_treeview_leave(self, event):
         """处理鼠标离开Treeview事件"""
+        if self.hover_job is not None:
+            self.root.after_cancel(self.hover_job)
+            self.hover_job = None
+        self.hover_cell = None
         self.hide_nbt_tooltip()
         self.reset_hover_bg()
-        self.current_hover_item = None
 
     def reset_hover_bg(self):
         """重置悬停行背景色"""
-        if self.current_hover_item:
-            tags = [t for t in self.trade_listbox.item(self.current_hover_item, "tags") if t != "hover"]
-            self.trade_listbox.item(self.current_hover_item, tags=tags)
-            original_bg = self.original_bg.get(self.current_hover_item, "#ffffff")
-            self.trade_listbox.tag_configure(tags[0], background=original_bg)
+        tree_item, self.current_hover_item = self.current_hover_item, None
+        idx = self._row_trade_index(tree_item) if tree_item else None
+        if idx is not None:
+            self._style_trade_row(tree_item, idx)
 
     # ---------------------- 指令生成与复制功能 ----------------------
     def generate_command(self):
@@ -1150,19 +1554,23 @@ class MainWindow:
         villager_name = self.villager_name.get().strip() or "CustomName"
         profession = self.profession_var.get()
         
-        # 生成所有步骤的指令
-        commands = self.command_generator.generate_all_commands(
-            villager_name, 
-            profession, 
-            self.trade_manager.trades,
-            self.nbt_handler
-        )
+        # 生成设置指令并填充到对应选项卡
+        commands = self.command_generator.generate_setup_commands(villager_name, profession)
+        for i, command in enumerate(commands):
+            self._fill_cmd_to_tab(self.tab_definitions[i][0], command)
         
-        # 填充到对应选项卡
-        for i, (tab_name, _) in enumerate(self.tab_definitions):
-            self._fill_cmd_to_tab(tab_name, commands[i])
+        self._clear_extra_command_tabs()
+        if self.chunk_commands_var.get():
+            self._fill_chunked_trade_commands(villager_name)
+            return
         
-        messagebox.showinfo("成功", "所有指令已生成！默认展示交易修改选项卡。\n如果是第一次创建，请按选项卡顺序执行命令")
+        # 交易列表指令分块写入最后一个选项卡，避免大量交易项时界面卡顿
+        fragments = self.command_generator.iter_trade_command(
+            villager_name,
+            list(self.trade_manager.trades),  # 快照，生成期间修改交易项不影响本次结果
+            self.nbt_handler
+        )
+        self._stream_cmd_to_tab(self.tab_definitions[-1][0], fragments)
 
     def _fill_cmd_to_tab(self, tab_name, command):
         """将指令填充到指定选项卡的文本框"""
@@ -1174,8 +1582,122 @@ class MainWindow:
         text_widget.insert(1.0, command)
         text_widget.config(state=tk.DISABLED)
 
+    def _chunked_trade_commands(self, villager_name):
+        """校验分段长度并生成全部分段指令，出错时提示并返回None"""
+        try:
+            max_bytes = int(self.chunk_budget.get().strip())
+            if max_bytes <= 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("错误", "分段长度必须是正整数！")
+            return None
+        
+        try:
+            return list(self.command_generator.iter_chunked_trade_commands(
+                villager_name, self.trade_manager.trades, self.nbt_handler, max_bytes
+            ))
+        except ValueError as e:
+            messagebox.showerror("生成失败", str(e))
+            return None
+
+    def _fill_chunked_trade_commands(self, villager_name):
+        """分段生成交易指令：第一条填入交易列表选项卡，其余各占一个追加的选项卡"""
+        trade_tab_name = self.tab_definitions[-1][0]
+        commands = self._chunked_trade_commands(villager_name)
+        if commands is None:
+            # 生成失败时清空交易列表选项卡，不保留上一次的指令
+            self._fill_cmd_to_tab(trade_tab_name, "")
+            return
+        
+        self._fill_cmd_to_tab(trade_tab_name, commands[0])
+        for n, command in enumerate(commands[1:], 2):
+            tab_name = f"步骤5-{n}"
+            tab_frame = self._create_command_tab(
+                tab_name, f"分段指令 {n}/{len(commands)}，请在执行上一个选项卡的指令后按顺序执行"
+            )
+            self.extra_command_tabs.append((tab_name, tab_frame))
+            self._fill_cmd_to_tab(tab_name, command)
+        
+        self.notebook.select(len(self.tab_definitions) - 1)
+        messagebox.showinfo("成功", f"交易列表指令已拆分为{len(commands)}条，请按选项卡顺序依次执行")
+
+    def _stream_cmd_to_tab(self, tab_name, fragments):
+        """清空选项卡文本框，然后每次事件循环写入一批指令片段"""
+        if self.cmd_stream_id:
+            self.root.after_cancel(self.cmd_stream_id)
+            self.cmd_stream_id = None
+        self._fill_cmd_to_tab(tab_name, "")
+        self.gen_btn.config(state=tk.DISABLED)
+        self._pump_cmd_fragments(self.command_tabs[tab_name], iter(fragments))
+
+    def _pump_cmd_fragments(self, text_widget, fragments):
+        chunk = []
+        try:
+            for fragment in fragments:
+                chunk.append(fragment)
+                if len(chunk) >= self.cmd_stream_chunk:
+                    break
+        except Exception as e:
+            # 生成中途出错时清空已写入的部分指令，避免留下看似完整的指令
+            self.cmd_stream_id = None
+            text_widget.config(state=tk.NORMAL)
+            text_widget.delete(1.0, tk.END)
+            text_widget.config(state=tk.DISABLED)
+            self.gen_btn.config(state=tk.NORMAL)
+            messagebox.showerror("生成失败", f"错误信息：{str(e)}")
+            return
+        text_widget.config(state=tk.NORMAL)
+        text_widget.insert(tk.END, "".join(chunk))
+        text_widget.config(state=tk.DISABLED)
+        
+        if len(chunk) >= self.cmd_stream_chunk:
+            self.cmd_stream_id = self.root.after(1, self._pump_cmd_fragments, text_widget, fragments)
+            return
+        self.cmd_stream_id = None
+        self.gen_btn.config(state=tk.NORMAL)
+        messagebox.showinfo("成功", "所有指令已生成！默认展示交易修改选项卡。\n如果是第一次创建，请按选项卡顺序执行命令")
+
+    def save_trade_command_to_file(self):
+        """把交易列表指令直接流式写入文件（不经过文本框）"""
+        if not self.trade_manager.trades:
+            messagebox.showwarning("提示", "请至少添加一个交易项！")
+            return
+        
+        # 分段模式先校验分段长度并生成全部指令，出错时不会创建或清空目标文件
+        villager_name = self.villager_name.get().strip() or "CustomName"
+        commands = None
+        if self.chunk_commands_var.get():
+            commands = self._chunked_trade_commands(villager_name)
+            if commands is None:
+                return
+        
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".txt",
+            filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")],
+            title="选择保存交易指令的路径"
+        )
+        if not file_path:
+            return
+        
+        try:
+            with open(file_path, "w", encoding="utf-8") as f:
+                if commands is not None:
+                    # 分段模式下每行一条指令
+                    for command in commands:
+                        f.write(command + "\n")
+                else:
+                    self.command_generator.write_trade_command(
+                        f, villager_name, self.trade_manager.trades, self.nbt_handler
+                    )
+            messagebox.showinfo("成功", f"交易指令已保存到：\n{os.path.basename(file_path)}")
+        except (OSError, ValueError) as e:
+            messagebox.showerror("保存失败", f"错误信息：{str(e)}")
+
     def copy_command_to_clipboard(self, text_widget):
         """复制指令到剪贴板"""
+        if self.cmd_stream_id:
+            messagebox.showwarning("提示", "指令仍在生成中，请稍候再复制！")
+            return
         self.root.clipboard_clear()
         cmd_content = text_widget.get(1.0, tk.END).strip()
         if not cmd_content:
@@ -0,0 +1,140 @@
+## Copyright (c) 2025 Radium-bit
+## SPDX-License-Identifier: GPL-V3
+## See LICENSE file for full terms
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualTreeview:
+    """
+    虚拟列表：只为可视区域（加少量预留行）创建Treeview行，由独立滚动条驱动，
+    打开耗时和内存与数据总量无关
+    render_row(key, row_id) 返回该行的Treeview选项（image/text/values/tags）
+    """
+
+    def __init__(self, parent, render_row, row_height=36, overscan=2, **tree_options):
+        self.render_row = render_row
+        self.row_height = row_height
+        self.overscan = overscan      # 可视区域下方额外渲染的行数（显示被截断的半行）
+        self.keys = []                # 当前数据（调用方定义的键，如物品下标）
+        self.offset = 0               # 第一行可见数据在keys中的位置
+        self.selected_key = None      # 选中项按数据键记录，滚动后仍能恢复
+        self._positions = {}          # {key: 在keys中的位置}
+        self._rows = []               # 行池中的Treeview行ID
+        self._row_keys = {}           # {row_id: 当前显示的key}
+
+        self.frame = ttk.Frame(parent)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree = ttk.Treeview(self.frame, **tree_options)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        self.tree.bind("<Configure>", lambda e: self._render())
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<Up>", lambda e: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda e: self._move_selection(-self._visible_count()))
+        self.tree.bind("<Next>", lambda e: self._move_selection(self._visible_count()))
+        for widget in (self.tree, self.scrollbar):
+            widget.bind("<MouseWheel>", self.on_mousewheel)
+            widget.bind("<Button-4>", self.on_mousewheel)  # Linux滚轮上滚
+            widget.bind("<Button-5>", self.on_mousewheel)  # Linux滚轮下滚
+
+    def set_keys(self, keys):
+        """替换列表数据并回到顶部（选中项不在新数据中时取消选中）"""
+        self.keys = list(keys)
+        self._positions = {key: pos for pos, key in enumerate(self.keys)}
+        if self.selected_key not in self._positions:
+            self.selected_key = None
+        self.offset = 0
+        self._render()
+
+    def row_key(self, row_id):
+        """返回行当前显示的数据键（行已复用或被删除时与原键不同）"""
+        return self._row_keys.get(row_id)
+
+    def _visible_count(self):
+        """可完整显示的行数（扣除表头高度）"""
+        top = 0
+        if self._rows:
+            bbox = self.tree.bbox(self._rows[0])
+            if bbox:
+                top = bbox[1]
+        return max((self.tree.winfo_height() - top) // self.row_height, 1)
+
+    def _render(self):
+        """按当前偏移量把数据填入行池，行数不足时补建，多余时删除"""
+        count = self._visible_count()
+        total = len(self.keys)
+        self.offset = min(max(self.offset, 0), max(total - count, 0))
+        pool_size = min(count + self.overscan, total - self.offset)
+
+        while len(self._rows) < pool_size:
+            self._rows.append(self.tree.insert("", tk.END))
+        while len(self._rows) > pool_size:
+            row_id = self._rows.pop()
+            self._row_keys.pop(row_id, None)
+            self.tree.delete(row_id)
+
+        selected_row = None
+        for i, row_id in enumerate(self._rows):
+            key = self.keys[self.offset + i]
+            if self._row_keys.get(row_id) != key:
+                self._row_keys[row_id] = key
+                self.tree.item(row_id, **self.render_row(key, row_id))
+            if key == self.selected_key:
+                selected_row = row_id
+
+        if selected_row:
+            self.tree.selection_set(selected_row)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+        # 行池始终从顶部显示，滚动完全由offset控制
+        self.tree.yview_moveto(0)
+        if total:
+            self.scrollbar.set(self.offset / total, min((self.offset + count) / total, 1.0))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        if selection:
+            self.selected_key = self._row_keys.get(selection[0])
+
+    def _on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self.offset = int(float(args[0]) * len(self.keys))
+        elif action == "scroll":
+            step = self._visible_count() if args[1] == "pages" else 1
+            self.offset += int(args[0]) * step
+        self._render()
+
+    def scroll(self, delta):
+        """按行滚动"""
+        self.offset += delta
+        self._render()
+
+    def on_mousewheel(self, event):
+        """滚轮滚动虚拟列表，并阻止事件冒泡到主窗口"""
+        if event.delta:
+            self.scroll(int(-1 * (event.delta / 120)))
+        elif event.num == 4:
+            self.scroll(-1)
+        elif event.num == 5:
+            self.scroll(1)
+        return "break"
+
+    def _move_selection(self, step):
+        """键盘移动选中项，必要时滚动使其可见"""
+        if not self.keys:
+            return "break"
+        pos = self._positions.get(self.selected_key)
+        pos = 0 if pos is None else min(max(pos + step, 0), len(self.keys) - 1)
+        self.selected_key = self.keys[pos]
+        count = self._visible_count()
+        if pos < self.offset:
+            self.offset = pos
+        elif pos >= self.offset + count:
+            self.offset = pos - count + 1
+        self._render()
+        return "break"
@@ -0,0 +1,65 @@
+## Copyright (c) 2025 Radium-bit
+## SPDX-License-Identifier: GPL-V3
+## See LICENSE file for full terms
+import os
+import subprocess
+import sys
+import unittest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 命令行模式和核心模块都不应加载的重量级/图形界面模块
+FORBIDDEN_MODULES = ("tkinter", "_tkinter", "PIL", "pypinyin")
+# 单独导入各核心模块的累计耗时上限（微秒），约为实测值的2倍，明显变慢时即可发现
+IMPORT_BUDGETS_US = {
+    "modules.cli": 160_000,
+    "modules.trade_manager": 45_000,
+    "modules.trade": 45_000,
+    "modules.nbt_handler": 45_000,
+    "modules.command_generator": 10_000,
+    "modules.config_io": 80_000,
+}
+
+
+def import_times(module):
+    """在新进程中用 -X importtime 导入module，返回 {模块名: 累计耗时（微秒）}"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        # 格式：import time: 自身耗时 | 累计耗时 | 模块名（缩进表示嵌套层级）
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+class CoreImportTimeTest(unittest.TestCase):
+    """命令行入口和核心模块只依赖标准库和非界面模块，单独导入时不加载tkinter/Pillow/pypinyin"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.times = {module: import_times(module) for module in IMPORT_BUDGETS_US}
+
+    def test_no_gui_or_optional_modules(self):
+        for module, times in self.times.items():
+            with self.subTest(module=module):
+                loaded = [name for name in times if name.split(".")[0] in FORBIDDEN_MODULES]
+                self.assertEqual(loaded, [], f"导入{module}时加载了不需要的模块：{loaded}")
+
+    def test_import_within_budget(self):
+        for module, budget in IMPORT_BUDGETS_US.items():
+            with self.subTest(module=module):
+                elapsed = self.times[module].get(module)
+                self.assertIsNotNone(elapsed, f"未记录到{module}的导入耗时")
+                self.assertLess(
+                    elapsed, budget,
+                    f"import {module} 耗时 {elapsed / 1000:.1f} ms，超过预算 {budget / 1000:.0f} ms"
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+## Copyright (c) 2025 Radium-bit
+## SPDX-License-Identifier: GPL-V3
+## See LICENSE file for full terms
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.item_search import ItemSearchIndex, bounded_substring_distance  # noqa: E402
+
+ITEMS = [
+    {"ID": "diamond", "Name": "Diamond"},
+    {"ID": "diamond_sword", "Name": "Diamond Sword"},
+    {"ID": "stone", "Name": "Stone"},
+    {"ID": "oak_planks", "Name": "Oak Planks"},
+]
+
+
+class TranspositionTest(unittest.TestCase):
+    """相邻两字符互换按一次编辑计算，短查询（只允许1处错误）也能匹配"""
+
+    def test_distance_counts_transposition_once(self):
+        self.assertEqual(bounded_substring_distance("diamnod", "diamond_sword", 1), 1)
+        self.assertEqual(bounded_substring_distance("stoen", "stone", 1), 1)
+
+    def test_distance_still_bounded(self):
+        self.assertIsNone(bounded_substring_distance("dmaiond", "diamond", 1))
+        self.assertEqual(bounded_substring_distance("diamond", "diamond", 0), 0)
+
+    def test_search_finds_transposed_query(self):
+        index = ItemSearchIndex(ITEMS)
+        self.assertEqual([item["ID"] for item in index.search("diamnod")], ["diamond", "diamond_sword"])
+        self.assertEqual([item["ID"] for item in index.search("oak_plnaks")], ["oak_planks"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+## Copyright (c) 2025 Radium-bit
+## SPDX-License-Identifier: GPL-V3
+## See LICENSE file for full terms
+import os
+import sys
+import types
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import ui_components, virtual_list  # noqa: E402
+
+HEADER_HEIGHT = 24
+ROW_HEIGHT = 36
+VISIBLE_ROWS = 5
+
+
+class FakeWidget:
+    """不需要显示器的控件替身，只接受布局、绑定和滚动条调用"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def pack(self, *args, **kwargs):
+        pass
+
+    def bind(self, *args, **kwargs):
+        pass
+
+    def set(self, *args):
+        pass
+
+
+class FakeTreeview(FakeWidget):
+    """按Treeview的语义记录行内容和选中行"""
+
+    def __init__(self, *args, **kwargs):
+        self.rows = {}
+        self._selection = ()
+        self._next_id = 0
+
+    def insert(self, parent, index, **options):
+        self._next_id += 1
+        row_id = f"I{self._next_id:03d}"
+        self.rows[row_id] = dict(options)
+        return row_id
+
+    def delete(self, *row_ids):
+        for row_id in row_ids:
+            del self.rows[row_id]
+        self._selection = tuple(row for row in self._selection if row not in row_ids)
+
+    def item(self, row_id, option=None, **options):
+        if option is not None:
+            return self.rows[row_id][option]
+        self.rows[row_id].update(options)
+
+    def selection(self):
+        return self._selection
+
+    def selection_set(self, *row_ids):
+        self._selection = row_ids
+
+    def selection_remove(self, *row_ids):
+        self._selection = tuple(row for row in self._selection if row not in row_ids)
+
+    def bbox(self, row_id):
+        return (0, HEADER_HEIGHT, 600, ROW_HEIGHT)
+
+    def winfo_height(self):
+        return HEADER_HEIGHT + ROW_HEIGHT * VISIBLE_ROWS
+
+    def yview_moveto(self, fraction):
+        pass
+
+
+class FakeEntry:
+    def __init__(self):
+        self.text = ""
+
+    def delete(self, first, last=None):
+        self.text = ""
+
+    def insert(self, index, text):
+        self.text = text
+
+
+FAKE_TTK = types.SimpleNamespace(Frame=FakeWidget, Scrollbar=FakeWidget, Treeview=FakeTreeview)
+
+
+class VirtualListSelectionTest(unittest.TestCase):
+    """虚拟列表中选中的物品滚出可视区域后仍能确认选择"""
+
+    def setUp(self):
+        items = [{"ID": f"item_{idx}", "Name": f"物品{idx}"} for idx in range(100)]
+        with mock.patch.object(virtual_list, "ttk", FAKE_TTK):
+            self.item_list = virtual_list.VirtualTreeview(
+                None,
+                lambda key, row_id: {"values": (items[key]["Name"],), "tags": (f"minecraft:{items[key]['ID']}",)},
+                row_height=ROW_HEIGHT
+            )
+        self.item_list.set_keys(range(len(items)))
+
+        self.window = ui_components.MainWindow.__new__(ui_components.MainWindow)
+        self.window.items_data = items
+        self.window.item_list = self.item_list
+        self.window.item_tree = self.item_list.tree
+        self.window.selector_target = "buy"
+        self.window.selector_win = mock.Mock()
+        self.window.buy_id = FakeEntry()
+
+    def select_row(self, position):
+        tree = self.item_list.tree
+        tree.selection_set(self.item_list._rows[position])
+        self.item_list._on_select(None)
+
+    def test_confirm_after_selected_row_scrolls_out_of_view(self):
+        self.select_row(2)
+        self.item_list.scroll(50)
+        self.assertEqual(self.item_list.tree.selection(), ())
+
+        with mock.patch.object(ui_components, "messagebox") as messagebox:
+            self.window._confirm_item_selection()
+        messagebox.showwarning.assert_not_called()
+        self.assertEqual(self.window.buy_id.text, "minecraft:item_2")
+
+    def test_confirm_warns_when_selection_filtered_out(self):
+        self.select_row(2)
+        self.item_list.set_keys([10, 11, 12])
+
+        with mock.patch.object(ui_components, "messagebox") as messagebox:
+            self.window._confirm_item_selection()
+        messagebox.showwarning.assert_called_once()
+        self.assertEqual(self.window.buy_id.text, "")
+
+
+if __name__ == "__main__":
+    unittest.main()